@@ -15,7 +15,7 @@ def show_before_after_comparison():
     print("=" * 80)
     
     # Check if processed data exists
-    train_path = Path("data/processed/train.csv")
+    train_path = Path("data/processed/dataset.parquet")
     
     if not train_path.exists():
         print("\n❌ Processed data not found!")
@@ -24,15 +24,19 @@ def show_before_after_comparison():
         return
     
     # Load processed data
-    df = pd.read_csv(train_path)
+    df = pd.read_parquet(train_path, filters=[('split', '==', 'train')]).drop(columns=['split'])
     
     print("\n📊 AFTER ENCODING (Current State):")
     print(f"  Total columns: {len(df.columns)}")
     print(f"  Total rows: {len(df)}")
     
-    # Check data types
-    object_cols = df.select_dtypes(include=['object']).columns.tolist()
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+    # Check data types (per-column stats computed once, reused below)
+    dtypes = df.dtypes
+    nunique = df.nunique()
+    object_cols = [col for col, dtype in dtypes.items()
+                   if dtype == object or isinstance(dtype, pd.CategoricalDtype)]
+    numeric_cols = [col for col, dtype in dtypes.items()
+                    if pd.api.types.is_numeric_dtype(dtype)]
     
     print(f"\n  Categorical (text) columns: {len(object_cols)}")
     if object_cols:
@@ -46,23 +50,22 @@ def show_before_after_comparison():
     # Show sample of column names
     print("\n📋 Sample of column names:")
     for i, col in enumerate(df.columns[:20]):
-        dtype = df[col].dtype
-        unique_vals = df[col].nunique()
-        print(f"  {i+1:2d}. {col:30s} | dtype: {str(dtype):8s} | unique: {unique_vals:4d}")
+        print(f"  {i+1:2d}. {col:30s} | dtype: {str(dtypes[col]):8s} | unique: {nunique[col]:4d}")
     
     if len(df.columns) > 20:
         print(f"  ... and {len(df.columns) - 20} more columns")
     
     # Show sample row
     print("\n📄 Sample row (first 10 columns):")
-    print(df.iloc[0, :10].to_dict())
+    print(df.iloc[:1, :10].to_dict('records')[0])
     
     # Show summary statistics
     print("\n📈 Summary Statistics:")
     print(f"  - All numeric: {'✅ YES' if len(object_cols) == 0 else '❌ NO'}")
     print(f"  - Ready for ML models: {'✅ YES' if len(object_cols) == 0 else '❌ NO'}")
-    print(f"  - Binary columns (0/1 only): {sum(df[col].nunique() == 2 for col in numeric_cols)}")
-    print(f"  - Continuous columns: {sum(df[col].nunique() > 10 for col in numeric_cols)}")
+    numeric_nunique = nunique[numeric_cols]
+    print(f"  - Binary columns (0/1 only): {int((numeric_nunique == 2).sum())}")
+    print(f"  - Continuous columns: {int((numeric_nunique > 10).sum())}")
     
     # Check for one-hot encoded columns
     onehot_cols = [col for col in df.columns if '_' in col and any(
@@ -37,14 +37,14 @@ def convert_xlsx_to_csv(
     
     # Load Excel file
     print(f"\n[1/4] Loading {input_file}...")
-    df = pd.read_excel(input_file)
+    df = pd.read_excel(input_file, engine="calamine")
     print(f"✓ Loaded {len(df)} rows, {len(df.columns)} columns")
     
     # Fix TotalCharges data type (object → numeric)
     print("\n[2/4] Fixing data types...")
     if 'TotalCharges' in df.columns:
         df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
-        df['TotalCharges'].fillna(0, inplace=True)
+        df['TotalCharges'] = df['TotalCharges'].fillna(0)
         print("✓ TotalCharges converted to numeric")
     
     # Drop customerID if requested
@@ -10,8 +10,6 @@ Production-ready REST API with:
 - Prometheus metrics
 """
 import os
-import sys
-from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
@@ -19,16 +17,12 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-import pandas as pd
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, Field, ConfigDict
+import numpy as np
 import uvicorn
 
-# Add src to path for imports
-project_root = Path(__file__).resolve().parent.parent.parent
-sys.path.insert(0, str(project_root / "src" / "models" / "model1"))
-
-from predict import ChurnPredictor
+from src.models.model1.predict import BatchedPredictor, ChurnPredictor
 
 # Configure logging
 logging.basicConfig(
@@ -37,28 +31,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global predictor instance
-predictor: Optional[ChurnPredictor] = None
 
 
-# Lifespan context manager for startup/shutdown
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Manage application lifespan (startup/shutdown)."""
-    # Startup
-    global predictor
+def _load_predictor() -> Optional[ChurnPredictor]:
+    """Load the model and preprocessor, or return None if they are unavailable."""
     try:
         logger.info("Loading model and preprocessor...")
-        predictor = ChurnPredictor()
+        loaded = ChurnPredictor()
         logger.info("Model loaded successfully")
+        return loaded
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
-        predictor = None
+        return None
+
+
+# Global predictor instance. Loaded at import time by default so a server
+# that imports the app before forking workers (e.g. gunicorn --preload with
+# uvicorn workers) shares the loaded model pages; set PRELOAD=0 to defer
+# loading to application startup. Not done in the __main__ copy of this
+# module: uvicorn.run below imports src.api.app again and preloads there.
+PRELOAD = os.getenv("PRELOAD", "1") == "1" and __name__ != "__main__"
+predictor: Optional[ChurnPredictor] = _load_predictor() if PRELOAD else None
+
+# Micro-batching of single predictions (flush on size or after max wait)
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 256))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", 5))
+batcher: Optional[BatchedPredictor] = None
+
+
+# Lifespan context manager for startup/shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage application lifespan (startup/shutdown)."""
+    # Startup
+    global predictor, batcher
+    if predictor is None:
+        predictor = _load_predictor()
+    
+    batcher = BatchedPredictor(predictor, max_batch=BATCH_MAX_SIZE,
+                               max_delay_ms=BATCH_MAX_WAIT_MS)
+    batcher.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down API...")
+    await batcher.stop()
 
 
 # Initialize FastAPI app with lifespan
@@ -68,6 +86,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # Rust-backed JSON encoding
     lifespan=lifespan
 )
 
@@ -82,46 +101,45 @@ app.add_middleware(
 
 
 # Pydantic models for request/response validation
+# Categorical fields must contain a non-whitespace character. Expressed as a
+# pattern constraint so pydantic-core checks it without calling back into Python.
+NON_EMPTY = r"\S"
+
+
 class CustomerFeatures(BaseModel):
     """Customer features for prediction."""
     
     # Demographics
-    gender: str = Field(..., description="Gender (Male/Female)")
+    gender: str = Field(..., pattern=NON_EMPTY, description="Gender (Male/Female)")
     SeniorCitizen: int = Field(..., ge=0, le=1, description="Senior citizen flag (0/1)")
-    Partner: str = Field(..., description="Has partner (Yes/No)")
-    Dependents: str = Field(..., description="Has dependents (Yes/No)")
+    Partner: str = Field(..., pattern=NON_EMPTY, description="Has partner (Yes/No)")
+    Dependents: str = Field(..., pattern=NON_EMPTY, description="Has dependents (Yes/No)")
     
     # Service information
     tenure: int = Field(..., ge=0, description="Months with company")
-    PhoneService: str = Field(..., description="Has phone service (Yes/No)")
-    MultipleLines: str = Field(..., description="Has multiple lines (Yes/No/No phone service)")
-    InternetService: str = Field(..., description="Internet service type (DSL/Fiber optic/No)")
-    OnlineSecurity: str = Field(..., description="Has online security (Yes/No/No internet service)")
-    OnlineBackup: str = Field(..., description="Has online backup (Yes/No/No internet service)")
-    DeviceProtection: str = Field(..., description="Has device protection (Yes/No/No internet service)")
-    TechSupport: str = Field(..., description="Has tech support (Yes/No/No internet service)")
-    StreamingTV: str = Field(..., description="Has streaming TV (Yes/No/No internet service)")
-    StreamingMovies: str = Field(..., description="Has streaming movies (Yes/No/No internet service)")
+    PhoneService: str = Field(..., pattern=NON_EMPTY, description="Has phone service (Yes/No)")
+    MultipleLines: str = Field(..., pattern=NON_EMPTY, description="Has multiple lines (Yes/No/No phone service)")
+    InternetService: str = Field(..., pattern=NON_EMPTY, description="Internet service type (DSL/Fiber optic/No)")
+    OnlineSecurity: str = Field(..., pattern=NON_EMPTY, description="Has online security (Yes/No/No internet service)")
+    OnlineBackup: str = Field(..., pattern=NON_EMPTY, description="Has online backup (Yes/No/No internet service)")
+    DeviceProtection: str = Field(..., pattern=NON_EMPTY, description="Has device protection (Yes/No/No internet service)")
+    TechSupport: str = Field(..., pattern=NON_EMPTY, description="Has tech support (Yes/No/No internet service)")
+    StreamingTV: str = Field(..., pattern=NON_EMPTY, description="Has streaming TV (Yes/No/No internet service)")
+    StreamingMovies: str = Field(..., pattern=NON_EMPTY, description="Has streaming movies (Yes/No/No internet service)")
     
     # Contract information
-    Contract: str = Field(..., description="Contract type (Month-to-month/One year/Two year)")
-    PaperlessBilling: str = Field(..., description="Has paperless billing (Yes/No)")
-    PaymentMethod: str = Field(..., description="Payment method")
+    Contract: str = Field(..., pattern=NON_EMPTY, description="Contract type (Month-to-month/One year/Two year)")
+    PaperlessBilling: str = Field(..., pattern=NON_EMPTY, description="Has paperless billing (Yes/No)")
+    PaymentMethod: str = Field(..., pattern=NON_EMPTY, description="Payment method")
     MonthlyCharges: float = Field(..., ge=0, description="Monthly charges in dollars")
     TotalCharges: float = Field(..., ge=0, description="Total charges in dollars")
     
-    @field_validator('gender', 'Partner', 'Dependents', 'PhoneService', 'MultipleLines', 
-                     'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
-                     'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract', 
-                     'PaperlessBilling', 'PaymentMethod')
-    @classmethod
-    def validate_categorical(cls, v: str) -> str:
-        """Validate categorical fields are not empty."""
-        if not v or v.strip() == "":
-            raise ValueError("Field cannot be empty")
-        return v
+    # Support history
+    numAdminTickets: int = Field(..., ge=0, description="Number of admin support tickets")
+    numTechTickets: int = Field(..., ge=0, description="Number of tech support tickets")
     
     model_config = ConfigDict(
+        frozen=True,
         json_schema_extra={
             "example": {
                 "gender": "Female",
@@ -142,7 +160,9 @@ class CustomerFeatures(BaseModel):
                 "PaperlessBilling": "Yes",
                 "PaymentMethod": "Electronic check",
                 "MonthlyCharges": 70.35,
-                "TotalCharges": 840.20
+                "TotalCharges": 840.20,
+                "numAdminTickets": 0,
+                "numTechTickets": 1
             }
         }
     )
@@ -229,22 +249,28 @@ async def predict(request: PredictionRequest):
         )
     
     try:
-        # Convert request to DataFrame
-        customers_data = [customer.dict() for customer in request.customers]
-        df = pd.DataFrame(customers_data)
+        # Dump all customers in one pydantic-core call (no per-model .dict())
+        customers_data = request.model_dump()['customers']
         
-        # Make predictions
-        results = predictor.predict(df)
+        # Make predictions (compiled NumPy encoder when the schema allows it)
+        results = predictor.predict_records(customers_data)
         
-        # Format response
-        predictions = []
-        for idx, (pred, prob) in enumerate(zip(results['prediction'], results['churn_probability'])):
-            predictions.append({
+        # Format response (risk levels assigned for the whole batch at once)
+        probabilities = results['churn_probability'].to_numpy(dtype=np.float64)
+        risk_levels = _get_risk_levels(probabilities)
+        predictions = [
+            {
                 "customer_index": idx,
                 "will_churn": bool(pred),
-                "churn_probability": round(float(prob), 4),
-                "risk_level": _get_risk_level(float(prob))
-            })
+                "churn_probability": prob,
+                "risk_level": risk
+            }
+            for idx, (pred, prob, risk) in enumerate(zip(
+                results['prediction'].tolist(),
+                probabilities.round(4).tolist(),
+                risk_levels.tolist()
+            ))
+        ]
         
         logger.info(f"Predicted {len(predictions)} customers")
         
@@ -275,7 +301,7 @@ async def predict_single(customer: CustomerFeatures):
         )
     
     try:
-        result = predictor.predict_single(customer.dict())
+        result = await batcher.predict_single(customer.model_dump())
         result['risk_level'] = _get_risk_level(result['churn_probability'])
         result['churn_probability'] = round(result['churn_probability'], 4)
         result['timestamp'] = datetime.utcnow().isoformat()
@@ -293,16 +319,25 @@ async def predict_single(customer: CustomerFeatures):
 
 
 # Helper functions
+RISK_LEVELS = np.array(["low", "medium", "high"])
+RISK_THRESHOLDS = [0.3, 0.6]
+
+
 def _get_risk_level(probability: float) -> str:
     """Categorize churn probability into risk levels."""
-    if probability < 0.3:
+    if probability < RISK_THRESHOLDS[0]:
         return "low"
-    elif probability < 0.6:
+    elif probability < RISK_THRESHOLDS[1]:
         return "medium"
     else:
         return "high"
 
 
+def _get_risk_levels(probabilities: np.ndarray) -> np.ndarray:
+    """Categorize an array of churn probabilities into risk levels (vectorized)."""
+    return RISK_LEVELS[np.digitize(probabilities, RISK_THRESHOLDS)]
+
+
 # Exception handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -326,7 +361,7 @@ if __name__ == "__main__":
     logger.info(f"Starting API server on {host}:{port}")
     
     uvicorn.run(
-        "app:app",
+        "src.api.app:app",
         host=host,
         port=port,
         reload=reload,
@@ -5,6 +5,10 @@ import pandas as pd
 import numpy as np
 
 
+# Right-closed upper edges of the 0-1yr, 1-2yr and 2-4yr tenure bins
+TENURE_BIN_EDGES = np.array([12, 24, 48], dtype=np.int16)
+
+
 def create_tenure_bins(df: pd.DataFrame) -> pd.DataFrame:
     """
     Create binned tenure features.
@@ -13,14 +17,14 @@ def create_tenure_bins(df: pd.DataFrame) -> pd.DataFrame:
         df: Input DataFrame
         
     Returns:
-        DataFrame with tenure bins
+        DataFrame with tenure bins (int8 ordinal codes)
     """
-    df_feat = df.copy()
+    df_feat = df
     
     if 'tenure' in df_feat.columns:
-        df_feat['tenure_bin'] = pd.cut(df_feat['tenure'], 
-                                        bins=[0, 12, 24, 48, 72],
-                                        labels=['0-1yr', '1-2yr', '2-4yr', '4+yr'])
+        # Ordinal bin codes straight from tenure (0: 0-1yr, 1: 1-2yr, 2: 2-4yr, 3: 4+yr)
+        # via a binary search over the right-closed edges, skipping string labels
+        df_feat = df_feat.assign(tenure_bin=tenure_bin_codes(df_feat['tenure'].to_numpy()))
     
     return df_feat
 
@@ -35,15 +39,51 @@ def create_revenue_features(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with revenue features
     """
-    df_feat = df.copy()
+    df_feat = df
     
     if 'MonthlyCharges' in df_feat.columns and 'tenure' in df_feat.columns:
-        # Average monthly charges over tenure
-        df_feat['avg_monthly_charges'] = df_feat['TotalCharges'] / (df_feat['tenure'] + 1)
+        # Average monthly charges over tenure, computed in float32
+        df_feat = df_feat.assign(avg_monthly_charges=avg_monthly_charges(
+            df_feat['TotalCharges'].to_numpy(), df_feat['tenure'].to_numpy()
+        ))
     
     return df_feat
 
 
+def add_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Create tenure bins and revenue features in a single pass.
+    
+    Equivalent to create_tenure_bins followed by create_revenue_features,
+    but tenure is read once and both columns are added with one assign.
+    
+    Args:
+        df: Input DataFrame
+        
+    Returns:
+        DataFrame with tenure_bin and avg_monthly_charges features
+    """
+    if 'tenure' not in df.columns:
+        return df
+    
+    tenure = df['tenure'].to_numpy()
+    features = {'tenure_bin': tenure_bin_codes(tenure)}
+    if 'MonthlyCharges' in df.columns:
+        features['avg_monthly_charges'] = avg_monthly_charges(df['TotalCharges'].to_numpy(), tenure)
+    
+    return df.assign(**features)
+
+
+def tenure_bin_codes(tenure: np.ndarray) -> np.ndarray:
+    """Map tenure (months) to int8 bin codes over TENURE_BIN_EDGES."""
+    return np.searchsorted(TENURE_BIN_EDGES, tenure).astype(np.int8)
+
+
+def avg_monthly_charges(total: np.ndarray, tenure: np.ndarray) -> np.ndarray:
+    """Average monthly charges over tenure, computed in float32."""
+    return total.astype(np.float32) / (tenure.astype(np.float32) + np.float32(1))
+
+
 def main():
     """Main function for feature engineering."""
     pass
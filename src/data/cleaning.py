@@ -15,16 +15,14 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with missing values handled
     """
-    df_clean = df.copy()
-    
     # Report missing values
-    missing_counts = df_clean.isnull().sum()
+    missing_counts = df.isnull().sum()
     if missing_counts.sum() > 0:
         print("Missing values found:")
         print(missing_counts[missing_counts > 0])
     
-    # Drop rows with missing values (can be customized)
-    df_clean = df_clean.dropna()
+    # Drop rows with missing values (can be customized); returns a new frame
+    df_clean = df.dropna()
     
     return df_clean
 
@@ -39,11 +37,17 @@ def handle_data_types(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame with corrected data types
     """
-    df_typed = df.copy()
+    df_typed = df
     
-    # Convert TotalCharges to numeric (if exists)
+    # Convert TotalCharges to float32 (if exists). Already-numeric columns are
+    # cast directly; text (with blank entries) is parsed and downcast in one go.
     if 'TotalCharges' in df_typed.columns:
-        df_typed['TotalCharges'] = pd.to_numeric(df_typed['TotalCharges'], errors='coerce')
+        total = df_typed['TotalCharges']
+        if pd.api.types.is_numeric_dtype(total):
+            total = total.astype(np.float32, copy=False)
+        else:
+            total = pd.to_numeric(total, errors='coerce', downcast='float')
+        df_typed = df_typed.assign(TotalCharges=total)
     
     return df_typed
 
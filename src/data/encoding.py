@@ -1,13 +1,46 @@
 """
 Categorical encoding module for converting text features to numeric.
 """
+import numpy as np
 import pandas as pd
-from typing import List, Optional
+from sklearn.preprocessing import OneHotEncoder
+from typing import List, Optional, Tuple
+
+
+def fit_onehot_encoder(df: pd.DataFrame,
+                       exclude_cols: Optional[List[str]] = None,
+                       sparse: bool = False) -> OneHotEncoder:
+    """
+    Fit a one-hot encoder on the categorical columns of a DataFrame.
+    
+    The fitted encoder can be persisted and passed back to
+    encode_categorical_features so later calls only run transform.
+    
+    Args:
+        df: Input DataFrame
+        exclude_cols: Columns to exclude from encoding (e.g., target)
+        sparse: Whether the encoder should produce sparse output
+        
+    Returns:
+        Fitted OneHotEncoder (categories in encoder.categories_)
+    """
+    if exclude_cols is None:
+        exclude_cols = ['Churn']
+    
+    categorical_cols = get_categorical_columns(df, exclude_cols=exclude_cols)
+    
+    encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=sparse, dtype=np.uint8)
+    encoder.fit(df[categorical_cols])
+    
+    return encoder
 
 
 def encode_categorical_features(df: pd.DataFrame, 
                                 encoding_type: str = 'onehot',
-                                exclude_cols: Optional[List[str]] = None) -> pd.DataFrame:
+                                exclude_cols: Optional[List[str]] = None,
+                                sparse: bool = False,
+                                encoder: Optional[OneHotEncoder] = None,
+                                categorical_cols: Optional[List[str]] = None):
     """
     Encode categorical features to numeric format.
     
@@ -15,19 +48,27 @@ def encode_categorical_features(df: pd.DataFrame,
         df: Input DataFrame
         encoding_type: Type of encoding ('onehot' or 'label')
         exclude_cols: Columns to exclude from encoding (e.g., target, already numeric)
+        sparse: For one-hot encoding, return a scipy CSR matrix (non-categorical
+            columns first, then the one-hot block) instead of a dense DataFrame
+        encoder: Fitted OneHotEncoder from fit_onehot_encoder. If given, its
+            columns are encoded with transform only; otherwise one is fitted.
+        categorical_cols: Columns to encode, if already known (e.g. from
+            get_categorical_columns). If None, they are detected from dtypes.
         
     Returns:
-        DataFrame with encoded categorical features
+        DataFrame with encoded categorical features, or a CSR matrix if sparse=True
     """
-    df_encoded = df.copy()
+    df_encoded = df
     
     # Default columns to exclude
     if exclude_cols is None:
         exclude_cols = ['Churn']  # Target variable already encoded
     
-    # Identify categorical columns (object/string dtype)
-    categorical_cols = df_encoded.select_dtypes(include=['object']).columns.tolist()
-    categorical_cols = [col for col in categorical_cols if col not in exclude_cols]
+    # Identify categorical columns (object/category dtype)
+    if encoder is not None:
+        categorical_cols = list(encoder.feature_names_in_)
+    elif categorical_cols is None:
+        categorical_cols = get_categorical_columns(df_encoded, exclude_cols=exclude_cols)
     
     if len(categorical_cols) == 0:
         print("  No categorical columns to encode")
@@ -37,16 +78,34 @@ def encode_categorical_features(df: pd.DataFrame,
     
     if encoding_type == 'onehot':
         # One-hot encoding (creates binary columns for each category)
-        df_encoded = pd.get_dummies(df_encoded, columns=categorical_cols, drop_first=False, dtype=int)
+        if encoder is None:
+            encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=sparse, dtype=np.uint8)
+            encoder.fit(df_encoded[categorical_cols])
+        
+        onehot = encoder.transform(df_encoded[categorical_cols])
+        other_cols = [col for col in df_encoded.columns if col not in categorical_cols]
+        
+        if sparse:
+            # Sparse output (only non-zero cells are stored)
+            from scipy import sparse as sp
+            
+            other = sp.csr_matrix(df_encoded[other_cols].to_numpy(dtype=np.float64))
+            matrix = sp.hstack([other, sp.csr_matrix(onehot)], format='csr')
+            print(f"  ✓ Sparse one-hot encoding complete: {matrix.shape[1]} total columns")
+            return matrix
+        
+        onehot_df = pd.DataFrame(onehot, columns=encoder.get_feature_names_out(),
+                                 index=df_encoded.index)
+        df_encoded = pd.concat([df_encoded[other_cols], onehot_df], axis=1)
         print(f"  ✓ One-hot encoding complete: {len(df_encoded.columns)} total columns")
         
     elif encoding_type == 'label':
-        # Label encoding (converts to integers 0, 1, 2, ...)
-        from sklearn.preprocessing import LabelEncoder
-        
-        for col in categorical_cols:
-            le = LabelEncoder()
-            df_encoded[col] = le.fit_transform(df_encoded[col].astype(str))
+        # Label encoding (converts to integers 0, 1, 2, ...). Category codes
+        # follow the sorted categories, like LabelEncoder, and use the smallest
+        # integer dtype (int8 for up to 127 categories).
+        df_encoded = df_encoded.assign(**{
+            col: _label_codes(df_encoded[col]) for col in categorical_cols
+        })
         
         print(f"  ✓ Label encoding complete: {len(categorical_cols)} columns encoded")
     
@@ -68,12 +127,12 @@ def encode_binary_features(df: pd.DataFrame,
     Returns:
         DataFrame with encoded binary features
     """
-    df_encoded = df.copy()
+    df_encoded = df
     
     if binary_cols is None:
         # Auto-detect columns with only Yes/No values
         binary_cols = []
-        for col in df_encoded.select_dtypes(include=['object']).columns:
+        for col in _split_cols(df_encoded)[0]:
             unique_vals = df_encoded[col].dropna().unique()
             if set(unique_vals).issubset({'Yes', 'No'}):
                 binary_cols.append(col)
@@ -81,11 +140,13 @@ def encode_binary_features(df: pd.DataFrame,
     if len(binary_cols) == 0:
         return df_encoded
     
+    binary_cols = [col for col in binary_cols if col in df_encoded.columns]
     print(f"  Encoding {len(binary_cols)} binary Yes/No columns to 1/0...")
     
-    for col in binary_cols:
-        if col in df_encoded.columns:
-            df_encoded[col] = df_encoded[col].map({'Yes': 1, 'No': 0})
+    # Single vectorized comparison over all binary columns, stored as int8
+    values = df_encoded[binary_cols].to_numpy(dtype=object)
+    encoded = (values == 'Yes').astype(np.int8)
+    df_encoded = df_encoded.assign(**dict(zip(binary_cols, encoded.T)))
     
     return df_encoded
 
@@ -104,12 +165,32 @@ def get_categorical_columns(df: pd.DataFrame, exclude_cols: Optional[List[str]]
     if exclude_cols is None:
         exclude_cols = []
     
-    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
-    categorical_cols = [col for col in categorical_cols if col not in exclude_cols]
+    categorical_cols = [col for col in _split_cols(df)[0] if col not in exclude_cols]
     
     return categorical_cols
 
 
+def _split_cols(df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    """Split columns into (object/category, other) lists from one dtypes read."""
+    dtypes = df.dtypes
+    is_categorical = [dtype == object or isinstance(dtype, pd.CategoricalDtype)
+                      for dtype in dtypes]
+    categorical = [col for col, flag in zip(dtypes.index, is_categorical) if flag]
+    other = [col for col, flag in zip(dtypes.index, is_categorical) if not flag]
+    return categorical, other
+
+
+def _label_codes(series: pd.Series) -> pd.Series:
+    """Category codes over the sorted categories (as LabelEncoder assigns them)."""
+    values = series.astype('category')
+    categories = values.cat.categories
+    if not categories.is_monotonic_increasing:
+        # Already-categorical input (e.g. Arrow dictionary columns) keeps its
+        # own category order, typically order of appearance
+        values = values.cat.reorder_categories(categories.sort_values())
+    return values.cat.codes
+
+
 def main():
     """Main function for encoding."""
     pass
@@ -3,19 +3,76 @@ Data ingestion module for loading raw data.
 """
 import pandas as pd
 from pathlib import Path
+from typing import Optional
 
 
-def load_raw_data(filepath: str) -> pd.DataFrame:
+# Explicit dtypes for the telco schema (skips dtype inference; categoricals are
+# stored as small integer codes). TotalCharges is left out on purpose: the raw
+# export contains blank strings that handle_data_types coerces to NaN.
+DTYPES = {
+    'customerID': 'string',
+    'gender': 'category',
+    'SeniorCitizen': 'int8',
+    'Partner': 'category',
+    'Dependents': 'category',
+    'tenure': 'int16',
+    'PhoneService': 'category',
+    'MultipleLines': 'category',
+    'InternetService': 'category',
+    'OnlineSecurity': 'category',
+    'OnlineBackup': 'category',
+    'DeviceProtection': 'category',
+    'TechSupport': 'category',
+    'StreamingTV': 'category',
+    'StreamingMovies': 'category',
+    'Contract': 'category',
+    'PaperlessBilling': 'category',
+    'PaymentMethod': 'category',
+    'MonthlyCharges': 'float32',
+    'numAdminTickets': 'int16',
+    'numTechTickets': 'int16',
+    'Churn': 'category',
+}
+
+
+def load_raw_data(filepath: str, chunksize: Optional[int] = None) -> pd.DataFrame:
     """
     Load raw telco churn data from CSV.
     
+    Uses pandas' pyarrow engine (multithreaded Arrow CSV parser) with the
+    explicit DTYPES above. For files too large to parse in one go, pass
+    chunksize: the file is then streamed with the C parser and each chunk is
+    type-converted and cleaned before the reduced chunks are concatenated,
+    which caps peak memory at roughly one raw chunk.
+    
     Args:
         filepath: Path to the raw CSV file
+        chunksize: Rows per chunk. If None, the whole file is read at once.
         
     Returns:
-        DataFrame with raw data
+        DataFrame with raw data (already typed and cleaned when chunked)
     """
-    df = pd.read_csv(filepath)
+    if chunksize is None:
+        df = pd.read_csv(filepath, engine='pyarrow', dtype=DTYPES)
+        return df
+    
+    from .cleaning import handle_data_types, handle_missing_values
+    
+    chunks = []
+    for chunk in pd.read_csv(filepath, engine='c', dtype=DTYPES, chunksize=chunksize):
+        chunk = handle_data_types(chunk)
+        chunk = handle_missing_values(chunk)
+        chunks.append(chunk)
+    
+    df = pd.concat(chunks, ignore_index=True, copy=False)
+    
+    # Chunks with different category sets concatenate to object; restore them
+    category_cols = [col for col, dtype in DTYPES.items()
+                     if dtype == 'category' and col in df.columns
+                     and not isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if category_cols:
+        df = df.astype({col: 'category' for col in category_cols})
+    
     return df
 
 
@@ -15,11 +15,14 @@ def encode_target(df: pd.DataFrame, target_col: str = 'Churn') -> pd.DataFrame:
     Returns:
         DataFrame with encoded target
     """
-    df_labeled = df.copy()
+    df_labeled = df
     
     if target_col in df_labeled.columns:
-        # Convert Yes/No to 1/0
-        df_labeled[target_col] = df_labeled[target_col].map({'Yes': 1, 'No': 0})
+        # Convert Yes/No to 1/0 (int8 unless unmapped values leave NaNs)
+        encoded = df_labeled[target_col].map({'Yes': 1, 'No': 0})
+        df_labeled = df_labeled.assign(
+            **{target_col: pd.to_numeric(encoded, downcast='integer')}
+        )
     
     return df_labeled
 
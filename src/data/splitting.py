@@ -2,8 +2,15 @@
 Data splitting module for train/validation/test splits.
 """
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from sklearn.model_selection import train_test_split
 from pathlib import Path
+from typing import Dict
+
+
+# Single file holding all splits, tagged by a 'split' column
+DATASET_FILE = "dataset.parquet"
 
 
 def split_data(df: pd.DataFrame, target_col: str = 'Churn', 
@@ -43,33 +50,72 @@ def split_data(df: pd.DataFrame, target_col: str = 'Churn',
     return X_train, X_val, X_test, y_train, y_val, y_test
 
 
+def _downcast_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast integer columns (e.g. one-hot 0/1 flags) to the smallest dtype.
+    
+    Args:
+        df: Input DataFrame
+        
+    Returns:
+        DataFrame with downcast integer columns
+    """
+    int_cols = df.select_dtypes(include=['integer']).columns
+    for col in int_cols:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    return df
+
+
+def write_split_dataset(splits: Dict[str, pd.DataFrame], filepath) -> None:
+    """
+    Write several splits to one Parquet file with a 'split' column.
+    
+    Each split is written as its own row group(s), so readers filtering on
+    the split column only decompress that split's byte ranges.
+    
+    Args:
+        splits: Mapping of split name to DataFrame (same columns in each)
+        filepath: Output Parquet path
+    """
+    # Downcast once over all splits so every split shares one schema
+    combined = pd.concat(
+        [split_df.assign(split=name) for name, split_df in splits.items()],
+        ignore_index=True
+    )
+    combined = _downcast_integers(combined)
+    combined['split'] = combined['split'].astype('category')
+    table = pa.Table.from_pandas(combined, preserve_index=False)
+    
+    with pq.ParquetWriter(filepath, table.schema, compression='snappy') as writer:
+        offset = 0
+        for split_df in splits.values():
+            writer.write_table(table.slice(offset, len(split_df)))
+            offset += len(split_df)
+
+
 def save_splits(X_train, X_val, X_test, y_train, y_val, y_test, 
                 output_dir: str = "data/processed"):
     """
-    Save data splits to CSV files.
+    Save data splits to a single Parquet dataset (snappy-compressed).
     
     Args:
         X_train, X_val, X_test: Feature DataFrames
         y_train, y_val, y_test: Target Series
-        output_dir: Directory to save splits
+        output_dir: Directory to save splits (written as dataset.parquet)
     """
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    # Combine features and target
-    train_df = X_train.copy()
-    train_df['Churn'] = y_train.values
-    
-    val_df = X_val.copy()
-    val_df['Churn'] = y_val.values
-    
-    test_df = X_test.copy()
-    test_df['Churn'] = y_test.values
+    # Combine features and target (new frames; with copy-on-write the
+    # feature columns are shared, not copied)
+    train_df = X_train.assign(Churn=y_train.values)
+    val_df = X_val.assign(Churn=y_val.values)
+    test_df = X_test.assign(Churn=y_test.values)
     
-    # Save to CSV
-    train_df.to_csv(output_path / "train.csv", index=False)
-    val_df.to_csv(output_path / "val.csv", index=False)
-    test_df.to_csv(output_path / "test.csv", index=False)
+    # Save to Parquet (keeps dtypes, so one-hot columns stay 1 byte per cell)
+    write_split_dataset({'train': train_df, 'val': val_df, 'test': test_df},
+                        output_path / DATASET_FILE)
     
     print(f"Saved splits to {output_dir}")
 
@@ -2,34 +2,102 @@
 DataLoader module for loading and preparing data for model training.
 """
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, List, Tuple
+from ...data.ingestion import DTYPES
+from ...data.splitting import DATASET_FILE, write_split_dataset
+
+
+# Arrow column types for the raw telco CSV, derived from the pandas DTYPES
+# (categoricals are dictionary-encoded, i.e. come back as pandas category)
+ARROW_TYPES = {
+    'string': pa.string(),
+    'category': pa.dictionary(pa.int32(), pa.string()),
+    'int8': pa.int8(),
+    'int16': pa.int16(),
+    'float32': pa.float32(),
+}
+RAW_COLUMN_TYPES = {col: ARROW_TYPES[dtype] for col, dtype in DTYPES.items()}
 
 
 class ChurnDataLoader:
     """DataLoader for telco churn dataset."""
     
+    # Split names and their human-readable labels (for error messages)
+    SPLIT_LABELS = {'train': 'Training', 'val': 'Validation', 'test': 'Test'}
+    
+    # Identifier columns kept in the processed data but never read as features
+    ID_COLUMNS = ['customerID']
+    
     def __init__(self, data_dir: str = "data/processed"):
         self.data_dir = Path(data_dir)
+        self.dataset_path = self.data_dir / DATASET_FILE
+        # Parquet dataset (opened on first use) and Arrow tables already read,
+        # keyed by split name
+        self._dataset = None
+        self._tables: Dict[str, pa.Table] = {}
     
-    def load_train_data(self) -> Tuple[pd.DataFrame, pd.Series]:
+    def _open_split(self, split: str) -> Tuple[ds.Dataset, List[str], dict]:
         """
-        Load training data.
+        Open the combined dataset and build the scan arguments for one split.
         
+        Args:
+            split: Split name ('train', 'val' or 'test')
+            
         Returns:
-            Tuple of (X_train, y_train)
+            Tuple of (dataset, feature column names, scan keyword arguments)
+        """
+        if self._dataset is None:
+            if not self.dataset_path.exists():
+                raise FileNotFoundError(f"{self.SPLIT_LABELS[split]} data not found at {self.dataset_path}")
+            self._dataset = ds.dataset(self.dataset_path, format='parquet')
+        
+        excluded = {'split', 'Churn', *self.ID_COLUMNS}
+        feature_cols = [name for name in self._dataset.schema.names if name not in excluded]
+        scan_args = {'filter': pc.field('split') == split,
+                     'columns': feature_cols + ['Churn']}
+        
+        return self._dataset, feature_cols, scan_args
+    
+    def _load_split(self, split: str) -> Tuple[pd.DataFrame, pd.Series]:
         """
-        train_path = self.data_dir / "train.csv"
+        Load one processed split and separate features from the target.
+        
+        The split is read from the combined dataset with a predicate on the
+        split column (only its row groups are decoded), and the Arrow table is
+        cached, so repeated calls (e.g. in CV loops) skip the disk read.
         
-        if not train_path.exists():
-            raise FileNotFoundError(f"Training data not found at {train_path}")
+        Args:
+            split: Split name ('train', 'val' or 'test')
+            
+        Returns:
+            Tuple of (X, y)
+        """
+        table = self._tables.get(split)
+        if table is None:
+            dataset, _, scan_args = self._open_split(split)
+            table = dataset.to_table(**scan_args)
+            self._tables[split] = table
         
-        df = pd.read_csv(train_path)
-        X = df.drop(columns=['Churn'])
-        y = df['Churn']
+        X = _as_category(table.drop_columns(['Churn']).to_pandas())
+        y = table.select(['Churn']).to_pandas()['Churn']
         
         return X, y
     
+    def load_train_data(self) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Load training data.
+        
+        Returns:
+            Tuple of (X_train, y_train)
+        """
+        return self._load_split('train')
+    
     def load_val_data(self) -> Tuple[pd.DataFrame, pd.Series]:
         """
         Load validation data.
@@ -37,16 +105,7 @@ class ChurnDataLoader:
         Returns:
             Tuple of (X_val, y_val)
         """
-        val_path = self.data_dir / "val.csv"
-        
-        if not val_path.exists():
-            raise FileNotFoundError(f"Validation data not found at {val_path}")
-        
-        df = pd.read_csv(val_path)
-        X = df.drop(columns=['Churn'])
-        y = df['Churn']
-        
-        return X, y
+        return self._load_split('val')
     
     def load_test_data(self) -> Tuple[pd.DataFrame, pd.Series]:
         """
@@ -55,21 +114,39 @@ class ChurnDataLoader:
         Returns:
             Tuple of (X_test, y_test)
         """
-        test_path = self.data_dir / "test.csv"
+        return self._load_split('test')
+    
+    def iter_split(self, split: str,
+                   batch_size: int = 65536) -> Iterator[Tuple[pd.DataFrame, pd.Series]]:
+        """
+        Iterate over a processed split in record batches.
         
-        if not test_path.exists():
-            raise FileNotFoundError(f"Test data not found at {test_path}")
+        Only one batch is materialized at a time, so memory stays constant
+        regardless of split size (e.g. for partial_fit-style training).
         
-        df = pd.read_csv(test_path)
-        X = df.drop(columns=['Churn'])
-        y = df['Churn']
+        Args:
+            split: Split name ('train', 'val' or 'test')
+            batch_size: Maximum number of rows per batch
+            
+        Yields:
+            Tuples of (X_batch, y_batch)
+        """
+        dataset, feature_cols, scan_args = self._open_split(split)
         
-        return X, y
+        for batch in dataset.to_batches(batch_size=batch_size, **scan_args):
+            if batch.num_rows == 0:
+                continue
+            X = _as_category(batch.select(feature_cols).to_pandas())
+            y = batch.select(['Churn']).to_pandas()['Churn']
+            yield X, y
     
     def load_raw_data(self, filepath: str = "data/raw/telco_churn.csv") -> pd.DataFrame:
         """
         Load raw data.
         
+        Parsed with pyarrow's multithreaded CSV reader using the known telco
+        column types (no dtype inference for those columns).
+        
         Args:
             filepath: Path to raw data file
             
@@ -81,7 +158,56 @@ class ChurnDataLoader:
         if not raw_path.exists():
             raise FileNotFoundError(f"Raw data not found at {raw_path}")
         
-        return pd.read_csv(raw_path)
+        table = pacsv.read_csv(
+            raw_path,
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20),
+            convert_options=pacsv.ConvertOptions(column_types=RAW_COLUMN_TYPES)
+        )
+        return table.to_pandas()
+
+
+def _as_category(X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast text feature columns to pandas category dtype.
+    
+    Categorical columns (saved unencoded by the pipeline with
+    --keep-categorical) then hold small integer codes, which the
+    preprocessor's encoders work from instead of the strings.
+    """
+    text_cols = X.select_dtypes(include=['object', 'string']).columns
+    if len(text_cols) == 0:
+        return X
+    return X.astype(dict.fromkeys(text_cols, 'category'))
+
+
+def convert_to_parquet(data_dir: str = "data/processed"):
+    """
+    Convert legacy per-split files (train/val/test as .csv or .parquet) into
+    the combined dataset.parquet, once.
+    
+    Nothing is done if dataset.parquet already exists.
+    
+    Args:
+        data_dir: Directory containing the processed splits
+    """
+    data_path = Path(data_dir)
+    dataset_path = data_path / DATASET_FILE
+    if dataset_path.exists():
+        return
+    
+    splits = {}
+    for split in ['train', 'val', 'test']:
+        parquet_path = data_path / f"{split}.parquet"
+        csv_path = data_path / f"{split}.csv"
+        
+        if parquet_path.exists():
+            splits[split] = pq.read_table(parquet_path).to_pandas()
+        elif csv_path.exists():
+            splits[split] = pacsv.read_csv(csv_path).to_pandas()
+    
+    if splits:
+        write_split_dataset(splits, dataset_path)
+        print(f"Converted {', '.join(splits)} splits -> {dataset_path}")
 
 
 def main():
@@ -1,10 +1,13 @@
 """
 Model definition module for churn prediction.
 """
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
+import os
 import joblib
+import numpy as np
 from pathlib import Path
+from scipy import sparse
 
 
 class ChurnModel:
@@ -24,23 +27,38 @@ class ChurnModel:
     def _create_model(self, model_type: str, **kwargs):
         """Create model instance based on type."""
         if model_type == 'random_forest':
+            # Trees are the unit of parallelism: no more workers than trees
+            n_estimators = kwargs.get('n_estimators', 128)
             return RandomForestClassifier(
-                n_estimators=kwargs.get('n_estimators', 100),
+                n_estimators=n_estimators,
                 max_depth=kwargs.get('max_depth', 10),
                 min_samples_split=kwargs.get('min_samples_split', 2),
+                # Each tree sees a half-size bootstrap sample: cheaper fits and
+                # smaller trees; ccp_alpha > 0 prunes them further
+                bootstrap=True,
+                max_samples=kwargs.get('max_samples', 0.5),
+                ccp_alpha=kwargs.get('ccp_alpha', 0.0),
                 random_state=kwargs.get('random_state', 42),
-                n_jobs=-1
+                n_jobs=kwargs.get('n_jobs', min(os.cpu_count() or 1, n_estimators))
             )
         elif model_type == 'gradient_boosting':
-            return GradientBoostingClassifier(
-                n_estimators=kwargs.get('n_estimators', 100),
+            # Histogram-based boosting: features are binned to uint8 once, then
+            # splits are found on per-bin histograms instead of sorted values
+            return HistGradientBoostingClassifier(
+                max_iter=kwargs.get('n_estimators', 100),
                 max_depth=kwargs.get('max_depth', 5),
                 learning_rate=kwargs.get('learning_rate', 0.1),
+                max_bins=kwargs.get('max_bins', 255),
+                categorical_features=kwargs.get('categorical_features'),
+                early_stopping=kwargs.get('early_stopping', True),
+                validation_fraction=0.1,
+                n_iter_no_change=10,
                 random_state=kwargs.get('random_state', 42)
             )
         elif model_type == 'logistic_regression':
             return LogisticRegression(
                 C=kwargs.get('C', 1.0),
+                solver=kwargs.get('solver', 'liblinear'),
                 max_iter=kwargs.get('max_iter', 1000),
                 random_state=kwargs.get('random_state', 42)
             )
@@ -55,7 +73,7 @@ class ChurnModel:
             X_train: Training features
             y_train: Training labels
         """
-        self.model.fit(X_train, y_train)
+        self.model.fit(self._prepare(X_train), y_train)
         return self
     
     def predict(self, X):
@@ -68,7 +86,7 @@ class ChurnModel:
         Returns:
             Predictions
         """
-        return self.model.predict(X)
+        return self.model.predict(self._prepare(X))
     
     def predict_proba(self, X):
         """
@@ -80,14 +98,55 @@ class ChurnModel:
         Returns:
             Prediction probabilities
         """
-        return self.model.predict_proba(X)
+        return self.model.predict_proba(self._prepare(X))
+    
+    def _prepare(self, X):
+        """Densify sparse input for models that do not accept it."""
+        if sparse.issparse(X) and isinstance(self.model, HistGradientBoostingClassifier):
+            return X.toarray()
+        return X
     
     def save(self, filepath: str):
-        """Save model to file."""
+        """Save model to file (LZ4-compressed, pickle protocol 5)."""
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-        joblib.dump(self, filepath)
+        joblib.dump(self, filepath, compress=('lz4', 3), protocol=5)
         print(f"Model saved to {filepath}")
     
+    @property
+    def uses_categorical_splits(self) -> bool:
+        """Whether the fitted model splits natively on categorical features."""
+        is_categorical = getattr(self.model, 'is_categorical_', None)
+        return is_categorical is not None and bool(is_categorical.any())
+    
+    def export_onnx(self, filepath: str, n_features: int):
+        """
+        Export the fitted model to ONNX for serving with ONNX Runtime.
+        
+        Requires skl2onnx. The graph takes a float32 'X' input and returns
+        the labels and a plain (n_samples, 2) probability tensor.
+        
+        Args:
+            filepath: Output .onnx path
+            n_features: Number of columns of the transformed feature matrix
+            
+        Raises:
+            ValueError: If the model uses native categorical splits
+        """
+        # skl2onnx converts categorical splits as numeric thresholds, which
+        # silently changes the predictions
+        if self.uses_categorical_splits:
+            raise ValueError("ONNX export does not support native categorical splits")
+        
+        from skl2onnx import to_onnx
+        
+        onx = to_onnx(self.model, np.zeros((1, n_features), dtype=np.float32),
+                      options={type(self.model): {'zipmap': False}},
+                      target_opset={'': 17, 'ai.onnx.ml': 3})
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        with open(filepath, 'wb') as f:
+            f.write(onx.SerializeToString())
+        print(f"ONNX model saved to {filepath}")
+    
     @staticmethod
     def load(filepath: str):
         """Load model from file."""
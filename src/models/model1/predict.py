@@ -1,23 +1,180 @@
 """
 Prediction module for making predictions with trained churn model.
 """
+import asyncio
+import numpy as np
 import pandas as pd
+import joblib
 from pathlib import Path
-from model import ChurnModel
-from preprocessing import ChurnPreprocessor
+from typing import Dict, List, Optional
+from scipy import sparse
+from sklearn import config_context
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from .model import ChurnModel
+from .preprocessing import ChurnPreprocessor
+from ...data.build_features import add_features, avg_monthly_charges, tenure_bin_codes
+
+
+class CompiledFeatureEncoder:
+    """
+    Record-to-feature-vector encoder specialized from fitted transformers.
+    
+    Precomputes, for the fitted pipeline one-hot encoder and the preprocessor's
+    StandardScaler / OneHotEncoder, the output index of every numeric field and
+    of every (categorical field, value) pair, plus the scaler's mean and scale
+    per output column. Records are then encoded with NumPy scatter operations
+    only, with results identical to the DataFrame path.
+    
+    Features the data pipeline derives (tenure_bin, avg_monthly_charges) are
+    computed from the raw fields, so records only need the raw fields.
+    """
+    
+    # Derived feature -> raw fields it is computed from (see build_features)
+    DERIVED_FIELDS = {
+        'tenure_bin': ['tenure'],
+        'avg_monthly_charges': ['TotalCharges', 'tenure'],
+    }
+    
+    def __init__(self, n_features: int, offset: np.ndarray, scale: np.ndarray,
+                 numeric_fields: List[str], numeric_idx: np.ndarray,
+                 lookups: Dict[str, Dict[str, List[int]]]):
+        self.n_features = n_features
+        self.offset = offset
+        self.scale = scale
+        self.numeric_fields = numeric_fields
+        self.numeric_idx = numeric_idx
+        self.lookups = lookups
+        # Raw fields a record must provide
+        self.fields = set(lookups)
+        for field in numeric_fields:
+            self.fields.update(self.DERIVED_FIELDS.get(field, [field]))
+    
+    @classmethod
+    def from_fitted(cls, preprocessor: ChurnPreprocessor,
+                    encoder: Optional[OneHotEncoder] = None):
+        """
+        Build the lookup tables from a fitted preprocessor (and pipeline encoder).
+        
+        Args:
+            preprocessor: Fitted ChurnPreprocessor
+            encoder: One-hot encoder fitted by the data pipeline, if any
+            
+        Returns:
+            CompiledFeatureEncoder, or None if the transformers are not supported
+        """
+        # Pipeline one-hot column name -> (raw field, value)
+        onehot_sources = {}
+        if encoder is not None:
+            names = iter(encoder.get_feature_names_out())
+            for field, categories in zip(encoder.feature_names_in_, encoder.categories_):
+                for value in categories:
+                    onehot_sources[next(names)] = (field, value)
+        
+        offset, scale = [], []
+        numeric_fields, numeric_idx = [], []
+        lookups: Dict[str, Dict[str, List[int]]] = {}
+        
+        for name, transformer, features in preprocessor.column_transformer.transformers_:
+            if len(features) == 0 or (isinstance(transformer, str) and transformer == 'drop'):
+                continue
+            
+            if isinstance(transformer, StandardScaler):
+                n = len(features)
+                offset.extend(transformer.mean_ if transformer.with_mean else np.zeros(n))
+                scale.extend(transformer.scale_ if transformer.with_std else np.ones(n))
+                for idx, col in enumerate(features, start=len(offset) - n):
+                    if col in onehot_sources:
+                        field, value = onehot_sources[col]
+                        lookups.setdefault(field, {}).setdefault(value, []).append(idx)
+                    else:
+                        numeric_fields.append(col)
+                        numeric_idx.append(idx)
+            
+            elif isinstance(transformer, OneHotEncoder):
+                drop_idx = transformer.drop_idx_
+                for i, (field, categories) in enumerate(zip(features, transformer.categories_)):
+                    table = lookups.setdefault(field, {})
+                    for j, value in enumerate(categories):
+                        if drop_idx is not None and drop_idx[i] is not None and j == drop_idx[i]:
+                            continue
+                        table.setdefault(value, []).append(len(offset))
+                        offset.append(0.0)
+                        scale.append(1.0)
+            
+            else:
+                return None
+        
+        return cls(
+            n_features=len(offset),
+            offset=np.asarray(offset, dtype=np.float64),
+            scale=np.asarray(scale, dtype=np.float64),
+            numeric_fields=numeric_fields,
+            numeric_idx=np.asarray(numeric_idx, dtype=np.intp),
+            lookups=lookups
+        )
+    
+    def accepts(self, record: dict) -> bool:
+        """Check whether a record provides every field the encoder needs."""
+        return self.fields.issubset(record)
+    
+    def transform(self, records: List[dict]) -> np.ndarray:
+        """
+        Encode records into the model's feature matrix.
+        
+        Args:
+            records: List of raw customer dictionaries
+            
+        Returns:
+            float32 feature matrix of shape (len(records), n_features)
+        """
+        X = np.zeros((len(records), self.n_features), dtype=np.float64)
+        
+        columns = {}
+        if 'tenure' in self.fields:
+            tenure = np.array([record['tenure'] for record in records])
+            columns['tenure_bin'] = tenure_bin_codes(tenure)
+            if 'TotalCharges' in self.fields:
+                total = np.array([record['TotalCharges'] for record in records])
+                columns['avg_monthly_charges'] = avg_monthly_charges(total, tenure)
+        
+        if self.numeric_fields:
+            X[:, self.numeric_idx] = np.column_stack([
+                columns[f] if f in self.DERIVED_FIELDS else [record[f] for record in records]
+                for f in self.numeric_fields
+            ])
+        
+        # Gather (row, column) pairs of all active one-hot cells, then scatter once
+        rows, cols = [], []
+        for field, table in self.lookups.items():
+            for row, record in enumerate(records):
+                idx = table.get(record[field])
+                if idx:
+                    rows.extend([row] * len(idx))
+                    cols.extend(idx)
+        X[rows, cols] = 1.0
+        
+        X -= self.offset
+        X /= self.scale
+        return X.astype(np.float32)
 
 
 class ChurnPredictor:
     """Predictor class for churn prediction."""
     
     def __init__(self, model_path: str = "models/churn_model.pkl",
-                 preprocessor_path: str = "models/preprocessor.pkl"):
+                 preprocessor_path: str = "models/preprocessor.pkl",
+                 encoder_path: str = "models/onehot_encoder.pkl",
+                 onnx_path: str = "models/churn_model.onnx"):
         """
         Initialize predictor with trained model and preprocessor.
         
         Args:
             model_path: Path to trained model (relative to project root)
             preprocessor_path: Path to fitted preprocessor (relative to project root)
+            encoder_path: Path to the one-hot encoder fitted by the data pipeline
+                (relative to project root). Optional; skipped if missing.
+            onnx_path: Path to the ONNX export of the model (relative to project
+                root). Used for inference when onnxruntime is installed.
         """
         # Get project root (3 levels up from this file)
         project_root = Path(__file__).resolve().parent.parent.parent.parent
@@ -33,6 +190,63 @@ class ChurnPredictor:
         
         self.model = ChurnModel.load(str(model_file))
         self.preprocessor = ChurnPreprocessor.load(str(preprocessor_file))
+        
+        # One-hot encoder fitted once by the data pipeline (transform only here)
+        encoder_file = project_root / encoder_path
+        self.encoder = joblib.load(encoder_file) if encoder_file.exists() else None
+        
+        # Specialized NumPy encoder for raw records (None if not supported)
+        self.compiled_encoder = CompiledFeatureEncoder.from_fitted(self.preprocessor, self.encoder)
+        
+        # ONNX Runtime session (runs outside the GIL); falls back to sklearn
+        self.session = self._load_onnx_session(project_root / onnx_path, model_file)
+    
+    def _load_onnx_session(self, onnx_file: Path, model_file: Path):
+        """
+        Create an ONNX Runtime session for the exported model, if usable.
+        
+        The export is skipped (and the joblib model used instead) when
+        onnxruntime is missing, the file is older than the pickled model
+        (i.e. left over from a previous training run), it fails to load, or
+        its input width does not match the model.
+        """
+        if not onnx_file.exists():
+            return None
+        if onnx_file.stat().st_mtime < model_file.stat().st_mtime:
+            print(f"Ignoring stale ONNX model (older than {model_file.name}): {onnx_file}")
+            return None
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            return None
+        
+        try:
+            session = ort.InferenceSession(str(onnx_file), providers=['CPUExecutionProvider'])
+        except Exception as e:
+            print(f"Failed to load ONNX model {onnx_file}: {e}")
+            return None
+        
+        n_features = getattr(self.model.model, 'n_features_in_', None)
+        if n_features is not None and session.get_inputs()[0].shape[1] != n_features:
+            print(f"Ignoring ONNX model with mismatched input width: {onnx_file}")
+            return None
+        
+        return session
+    
+    def _encode_categorical(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Apply the pipeline's fitted one-hot encoder to raw categorical columns."""
+        if self.encoder is None:
+            return X
+        
+        categorical_cols = list(self.encoder.feature_names_in_)
+        if not set(categorical_cols).issubset(X.columns):
+            # Already encoded (e.g. processed splits)
+            return X
+        
+        onehot = pd.DataFrame(self.encoder.transform(X[categorical_cols]),
+                              columns=self.encoder.get_feature_names_out(),
+                              index=X.index)
+        return pd.concat([X.drop(columns=categorical_cols), onehot], axis=1)
     
     def predict(self, X: pd.DataFrame) -> pd.DataFrame:
         """
@@ -44,12 +258,46 @@ class ChurnPredictor:
         Returns:
             DataFrame with predictions and probabilities
         """
-        # Transform features
+        # Transform features (deriving the engineered ones for raw records)
+        if 'tenure_bin' not in X.columns:
+            X = add_features(X)
+        X = self._encode_categorical(X)
         X_transformed = self.preprocessor.transform(X)
         
+        return self._predict_transformed(X_transformed)
+    
+    def predict_records(self, records: List[dict]) -> pd.DataFrame:
+        """
+        Make predictions on raw customer records.
+        
+        Uses the compiled NumPy encoder when it covers the records' fields,
+        otherwise falls back to the DataFrame path in predict().
+        
+        Args:
+            records: List of customer feature dictionaries
+            
+        Returns:
+            DataFrame with predictions and probabilities
+        """
+        if self.compiled_encoder is not None and self.compiled_encoder.accepts(records[0]):
+            return self._predict_transformed(self.compiled_encoder.transform(records))
+        
+        return self.predict(pd.DataFrame.from_records(records))
+    
+    def _predict_transformed(self, X_transformed) -> pd.DataFrame:
+        """Run the model on an already transformed feature matrix."""
         # Make predictions
-        predictions = self.model.predict(X_transformed)
-        probabilities = self.model.predict_proba(X_transformed)[:, 1]
+        if self.session is not None:
+            if sparse.issparse(X_transformed):
+                X_transformed = X_transformed.toarray()
+            X = np.ascontiguousarray(X_transformed, dtype=np.float32)
+            predictions, probabilities = self.session.run(None, {'X': X})
+            probabilities = probabilities[:, 1]
+        else:
+            # Output of the fitted preprocessor; skip sklearn's finiteness scans
+            with config_context(assume_finite=True):
+                predictions = self.model.predict(X_transformed)
+                probabilities = self.model.predict_proba(X_transformed)[:, 1]
         
         # Create results DataFrame
         results = pd.DataFrame({
@@ -69,11 +317,8 @@ class ChurnPredictor:
         Returns:
             Dictionary with prediction and probability
         """
-        # Convert to DataFrame
-        X = pd.DataFrame([customer_data])
-        
-        # Get prediction
-        results = self.predict(X)
+        # Encoded straight from the dict by the compiled encoder when possible
+        results = self.predict_records([customer_data])
         
         return {
             'will_churn': bool(results['prediction'].iloc[0]),
@@ -81,6 +326,102 @@ class ChurnPredictor:
         }
 
 
+class BatchedPredictor:
+    """
+    Coalesce concurrent single-customer predictions into batched calls.
+    
+    Requests are put on a bounded asyncio queue; a worker task drains up to
+    max_batch of them (waiting at most max_delay_ms after the first), runs
+    one vectorized predict_records call in a worker thread and resolves each
+    request's future with its own row of the result.
+    """
+    
+    def __init__(self, predictor: ChurnPredictor, max_batch: int = 128,
+                 max_delay_ms: float = 5, max_queue: int = 1024):
+        """
+        Initialize the batcher (call start() from a running event loop).
+        
+        Args:
+            predictor: Predictor used for the batched calls
+            max_batch: Maximum number of requests per batch
+            max_delay_ms: Maximum time to wait for a batch to fill
+            max_queue: Maximum number of queued requests (callers wait when full)
+        """
+        self.predictor = predictor
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Create the queue and start the worker task."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Cancel the worker task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def predict_single(self, customer_data: dict) -> dict:
+        """
+        Queue one customer for the next batch and wait for its prediction.
+        
+        Args:
+            customer_data: Dictionary with customer features
+            
+        Returns:
+            Dictionary with prediction and probability
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((customer_data, future))
+        return await future
+    
+    async def _next_batch(self) -> list:
+        """Wait for one request, then collect more until full or timed out."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_delay_ms / 1000
+        
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self):
+        """Worker loop: predict each batch once and demultiplex the results."""
+        while True:
+            batch = await self._next_batch()
+            records = [record for record, _ in batch]
+            futures = [future for _, future in batch]
+            
+            try:
+                results = await asyncio.to_thread(self.predictor.predict_records, records)
+                for future, pred, prob in zip(futures, results['prediction'].tolist(),
+                                              results['churn_probability'].tolist()):
+                    if not future.done():
+                        future.set_result({
+                            'will_churn': bool(pred),
+                            'churn_probability': float(prob)
+                        })
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+
 def main():
     """Main function for prediction."""
     pass
@@ -5,15 +5,32 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
 import joblib
 from pathlib import Path
+from scipy import sparse
 
 
 class ChurnPreprocessor:
     """Preprocessor for telco churn data."""
     
-    def __init__(self):
+    # Identifier columns, never used as features (ChurnDataLoader already
+    # skips them; raw frames passed straight to fit may still have them)
+    ID_COLUMNS = ['customerID']
+    
+    def __init__(self, encode_categorical: str = 'onehot'):
+        """
+        Initialize preprocessor.
+        
+        Args:
+            encode_categorical: 'onehot' for one-hot columns, or 'ordinal' for
+                one integer code column per categorical (for tree models with
+                native categorical support; unknown values become NaN)
+        """
+        if encode_categorical not in ('onehot', 'ordinal'):
+            raise ValueError(f"Unknown categorical encoding: {encode_categorical}")
+        
+        self.encode_categorical = encode_categorical
         self.column_transformer = None
         self.label_encoders = {}
         self.feature_names = None
@@ -25,24 +42,29 @@ class ChurnPreprocessor:
         Args:
             X: Training features DataFrame
         """
-        # Identify numeric and categorical columns
-        numeric_features = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
-        categorical_features = X.select_dtypes(include=['object']).columns.tolist()
+        # Identify numeric and categorical columns (ID columns are dropped)
+        X = X.drop(columns=self.ID_COLUMNS, errors='ignore')
+        numeric_features = X.select_dtypes(include=['number']).columns.tolist()
+        categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
         
-        # Remove customer ID if present
-        if 'customerID' in numeric_features:
-            numeric_features.remove('customerID')
-        if 'customerID' in categorical_features:
-            categorical_features.remove('customerID')
+        if self.encode_categorical == 'ordinal':
+            # Unseen categories become NaN, which only gradient_boosting
+            # (HistGradientBoosting) accepts; train.py enforces that pairing
+            categorical_encoder = OrdinalEncoder(handle_unknown='use_encoded_value',
+                                                 unknown_value=np.nan, dtype=np.float32)
+        else:
+            categorical_encoder = OneHotEncoder(drop='first', sparse_output=True,
+                                                handle_unknown='ignore', dtype=np.float32)
         
-        # Create column transformer
+        # Create column transformer (one-hot block is sparse; the stacked
+        # output is a CSR matrix when under 30% of its cells are non-zero)
         self.column_transformer = ColumnTransformer(
             transformers=[
                 ('num', StandardScaler(), numeric_features),
-                ('cat', OneHotEncoder(drop='first', sparse_output=False, handle_unknown='ignore'), 
-                 categorical_features)
+                ('cat', categorical_encoder, categorical_features)
             ],
-            remainder='drop'
+            remainder='drop',
+            sparse_threshold=0.3
         )
         
         # Fit the transformer
@@ -61,12 +83,22 @@ class ChurnPreprocessor:
             X: Features DataFrame
             
         Returns:
-            Transformed features array
+            Transformed float32 features (ndarray, or scipy CSR matrix if mostly zeros)
         """
         if self.column_transformer is None:
             raise ValueError("Preprocessor must be fitted before transform")
         
-        return self.column_transformer.transform(X)
+        # Scale in float64 whatever the input dtypes (float32 columns included),
+        # so every input path rounds identically, then store the result as
+        # float32 (what the tree models use internally anyway)
+        float32_cols = [col for col, dtype in X.dtypes.items() if dtype == np.float32]
+        if float32_cols:
+            X = X.astype(dict.fromkeys(float32_cols, np.float64))
+        
+        X_transformed = self.column_transformer.transform(X)
+        if sparse.issparse(X_transformed):
+            return X_transformed.astype(np.float32)
+        return np.ascontiguousarray(X_transformed, dtype=np.float32)
     
     def fit_transform(self, X: pd.DataFrame) -> np.ndarray:
         """
@@ -76,11 +108,22 @@ class ChurnPreprocessor:
             X: Features DataFrame
             
         Returns:
-            Transformed features array
+            Transformed features (ndarray, or scipy CSR matrix if mostly zeros)
         """
         self.fit(X)
         return self.transform(X)
     
+    @property
+    def categorical_indices(self) -> list:
+        """Output column indices of ordinal-encoded categoricals (empty for one-hot)."""
+        if getattr(self, 'encode_categorical', 'onehot') != 'ordinal':
+            return []
+        
+        # The categorical block comes last in the output
+        _, _, categorical_features = self.column_transformer.transformers_[1]
+        n_features = len(self.feature_names)
+        return list(range(n_features - len(categorical_features), n_features))
+    
     def _get_feature_names(self):
         """Get feature names after transformation."""
         feature_names = []
@@ -88,7 +131,7 @@ class ChurnPreprocessor:
         for name, transformer, features in self.column_transformer.transformers_:
             if name == 'num':
                 feature_names.extend(features)
-            elif name == 'cat':
+            elif name == 'cat' and len(features) > 0:
                 if hasattr(transformer, 'get_feature_names_out'):
                     cat_features = transformer.get_feature_names_out(features)
                     feature_names.extend(cat_features)
@@ -96,9 +139,9 @@ class ChurnPreprocessor:
         return feature_names
     
     def save(self, filepath: str):
-        """Save preprocessor to file."""
+        """Save preprocessor to file (LZ4-compressed, pickle protocol 5)."""
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-        joblib.dump(self, filepath)
+        joblib.dump(self, filepath, compress=('lz4', 3), protocol=5)
         print(f"Preprocessor saved to {filepath}")
     
     @staticmethod
@@ -4,17 +4,156 @@ Training module for churn prediction model.
 import yaml
 import os
 import sys
+import hashlib
+import json
 from pathlib import Path
-from dataloader import ChurnDataLoader
-from preprocessing import ChurnPreprocessor
-from model import ChurnModel
+from . import dataloader
+from .dataloader import ChurnDataLoader
+from . import preprocessing
+from .preprocessing import ChurnPreprocessor
+from .model import ChurnModel
 from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score, roc_auc_score,
+    precision_recall_fscore_support, roc_auc_score,
     classification_report, confusion_matrix
 )
 import mlflow
 import mlflow.sklearn
 import numpy as np
+import sklearn
+from scipy import sparse
+from sklearn import config_context
+from joblib import Parallel, delayed
+
+
+def _evaluate(model: ChurnModel, X, y):
+    """
+    Compute classification metrics from a single predict_proba pass.
+    
+    Labels are derived as proba > 0.5, which is what predict() returns for
+    the binary models used here.
+    
+    Args:
+        model: Fitted model
+        X: Transformed features
+        y: True labels
+        
+    Returns:
+        Tuple of (metrics dict, predicted labels)
+    """
+    y_true = np.asarray(y)
+    y_proba = model.predict_proba(X)[:, 1]
+    y_pred = (y_proba > 0.5).astype(np.int8)
+    
+    precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, average='binary')
+    metrics = {
+        'accuracy': float((y_pred == y_true).mean()),
+        'precision': float(precision),
+        'recall': float(recall),
+        'f1': float(f1),
+        'auc': float(roc_auc_score(y_true, y_proba))
+    }
+    
+    return metrics, y_pred
+
+
+def _fit_and_score(model_type: str, params: dict, X_train, y_train, X_val, y_val):
+    """
+    Fit one candidate model and score it on the validation set.
+    
+    Args:
+        model_type: Model type passed to ChurnModel
+        params: Shared model parameters (model_type is overridden)
+        X_train: Transformed training features
+        y_train: Training labels
+        X_val: Transformed validation features
+        y_val: Validation labels
+        
+    Returns:
+        Tuple of (fitted model, validation metrics)
+    """
+    model = ChurnModel(**{**params, 'model_type': model_type})
+    with config_context(assume_finite=True):
+        model.fit(X_train, y_train)
+        val_metrics, _ = _evaluate(model, X_val, y_val)
+    
+    return model, val_metrics
+
+
+def _select_model(model_types: list, params: dict, X_train, y_train, X_val, y_val):
+    """
+    Train candidate models in parallel and keep the one with the best val F1.
+    
+    One worker process per candidate; each model's own thread pool is capped
+    at its share of the cores so the workers don't oversubscribe them.
+    
+    Args:
+        model_types: Candidate model types
+        params: Shared model parameters
+        X_train: Transformed training features
+        y_train: Training labels
+        X_val: Transformed validation features
+        y_val: Validation labels
+        
+    Returns:
+        Tuple of (best model, validation F1 per model type)
+    """
+    params = {**params, 'n_jobs': max(1, (os.cpu_count() or 1) // len(model_types))}
+    
+    results = Parallel(n_jobs=len(model_types), backend='loky', batch_size=1)(
+        delayed(_fit_and_score)(model_type, params, X_train, y_train, X_val, y_val)
+        for model_type in model_types
+    )
+    
+    scores = {model_type: metrics['f1'] for model_type, (_, metrics) in zip(model_types, results)}
+    for model_type, f1 in scores.items():
+        print(f"  {model_type:22s} val F1: {f1:.4f}")
+    
+    best_model, _ = max(results, key=lambda result: result[1]['f1'])
+    print(f"Selected model: {best_model.model_type}")
+    
+    return best_model, scores
+
+
+def _save_features(path: Path, X):
+    """Save a transformed feature matrix (.npy for dense, .npz for sparse)."""
+    if sparse.issparse(X):
+        sparse.save_npz(path.with_suffix('.npz'), X)
+    else:
+        np.save(path.with_suffix('.npy'), X)
+
+
+def _load_features(path: Path):
+    """Load a cached feature matrix (dense arrays are memory-mapped), or None."""
+    if path.with_suffix('.npy').exists():
+        return np.load(path.with_suffix('.npy'), mmap_mode='r')
+    if path.with_suffix('.npz').exists():
+        return sparse.load_npz(path.with_suffix('.npz'))
+    return None
+
+
+def _feature_cache_key(data_dir: str, preprocessing_config: dict) -> str:
+    """
+    Content hash of the processed dataset, the preprocessing settings and
+    the loading and preprocessing code.
+    
+    Args:
+        data_dir: Directory containing the processed splits
+        preprocessing_config: The config's preprocessing section
+        
+    Returns:
+        Short hex digest identifying the transformed features
+    """
+    digest = hashlib.sha256()
+    with open(Path(data_dir) / "dataset.parquet", 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(json.dumps(preprocessing_config, sort_keys=True).encode())
+    # The loader decides which columns are features and their dtypes
+    digest.update(Path(dataloader.__file__).read_bytes())
+    digest.update(Path(preprocessing.__file__).read_bytes())
+    digest.update(sklearn.__version__.encode())
+    
+    return digest.hexdigest()[:16]
 
 
 def train_model(config_path: str = "configs/model1.yaml"):
@@ -41,6 +180,16 @@ def train_model(config_path: str = "configs/model1.yaml"):
     config['data_dir'] = str(project_root / config.get('data_dir', 'data/processed'))
     config['model_dir'] = str(project_root / config.get('model_dir', 'models'))
     
+    # Ordinal encoding maps unseen categories to NaN, which only the
+    # histogram gradient boosting model handles (others would return NaN
+    # probabilities under assume_finite at serving time)
+    encode_categorical = config.get('preprocessing', {}).get('encode_categorical', 'onehot')
+    model_types = (config.get('candidate_models')
+                   or [config.get('model_params', {}).get('model_type', 'random_forest')])
+    if encode_categorical == 'ordinal' and set(model_types) != {'gradient_boosting'}:
+        raise ValueError(f"encode_categorical 'ordinal' requires model_type 'gradient_boosting', "
+                         f"got {model_types}")
+    
     print("=" * 50)
     print("Starting model training...")
     print("=" * 50)
@@ -56,14 +205,31 @@ def train_model(config_path: str = "configs/model1.yaml"):
     print(f"Training samples: {len(X_train)}")
     print(f"Validation samples: {len(X_val)}")
     
-    # Preprocess data
-    print("\nPreprocessing data...")
-    preprocessor = ChurnPreprocessor()
-    X_train_transformed = preprocessor.fit_transform(X_train)
-    X_val_transformed = preprocessor.transform(X_val)
+    # Preprocess data (reusing cached features when the inputs are unchanged)
+    cache_dir = project_root / config.get('cache_dir', 'data/interim/cache')
+    cache_key = _feature_cache_key(config['data_dir'], config.get('preprocessing', {}))
+    X_train_cache = cache_dir / f"X_train_{cache_key}"
+    X_val_cache = cache_dir / f"X_val_{cache_key}"
+    preprocessor_cache = cache_dir / f"preprocessor_{cache_key}.pkl"
+    
+    X_train_transformed = _load_features(X_train_cache)
+    X_val_transformed = _load_features(X_val_cache)
+    
+    if X_train_transformed is not None and X_val_transformed is not None and preprocessor_cache.exists():
+        print(f"\nLoading cached features ({cache_key})...")
+        preprocessor = ChurnPreprocessor.load(preprocessor_cache)
+    else:
+        print("\nPreprocessing data...")
+        preprocessor = ChurnPreprocessor(encode_categorical=encode_categorical)
+        X_train_transformed = preprocessor.fit_transform(X_train)
+        X_val_transformed = preprocessor.transform(X_val)
+        
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        _save_features(X_train_cache, X_train_transformed)
+        _save_features(X_val_cache, X_val_transformed)
+        preprocessor.save(preprocessor_cache)
     
     # Set MLflow tracking to use SQLite backend (avoids filesystem deprecation warning)
-    project_root = Path(__file__).resolve().parent.parent.parent.parent
     mlflow_db = project_root / "mlflow.db"
     mlflow.set_tracking_uri(f"sqlite:///{mlflow_db}")
     
@@ -74,51 +240,46 @@ def train_model(config_path: str = "configs/model1.yaml"):
         # Log parameters
         mlflow.log_params(config.get('model_params', {}))
         
-        # Initialize and train model
+        # Initialize and train model (or pick the best of several candidates)
         print("\nTraining model...")
-        model = ChurnModel(**config.get('model_params', {}))
-        model.fit(X_train_transformed, y_train)
+        model_params = config.get('model_params', {})
+        if preprocessor.categorical_indices:
+            # Ordinal-encoded categoricals: split on them natively (gradient boosting)
+            model_params = {'categorical_features': preprocessor.categorical_indices, **model_params}
+        candidate_models = config.get('candidate_models') or []
         
-        # Evaluate on training set
-        y_train_pred = model.predict(X_train_transformed)
-        y_train_proba = model.predict_proba(X_train_transformed)[:, 1]
+        if len(candidate_models) > 1:
+            model, candidate_f1 = _select_model(candidate_models, model_params,
+                                                X_train_transformed, y_train,
+                                                X_val_transformed, y_val)
+            mlflow.log_param('selected_model_type', model.model_type)
+            mlflow.log_metrics({f'candidate_{model_type}_val_f1': f1
+                                for model_type, f1 in candidate_f1.items()})
+        else:
+            model = ChurnModel(**model_params)
         
-        train_accuracy = accuracy_score(y_train, y_train_pred)
-        train_precision = precision_score(y_train, y_train_pred)
-        train_recall = recall_score(y_train, y_train_pred)
-        train_f1 = f1_score(y_train, y_train_pred)
-        train_auc = roc_auc_score(y_train, y_train_proba)
-        
-        # Evaluate on validation set
-        y_val_pred = model.predict(X_val_transformed)
-        y_val_proba = model.predict_proba(X_val_transformed)[:, 1]
-        
-        val_accuracy = accuracy_score(y_val, y_val_pred)
-        val_precision = precision_score(y_val, y_val_pred)
-        val_recall = recall_score(y_val, y_val_pred)
-        val_f1 = f1_score(y_val, y_val_pred)
-        val_auc = roc_auc_score(y_val, y_val_proba)
+        # The transformed features come out of our own preprocessor, so skip
+        # sklearn's per-call NaN/inf scans over the full matrices
+        with config_context(assume_finite=True):
+            if len(candidate_models) <= 1:
+                model.fit(X_train_transformed, y_train)
+            
+            # Evaluate on training and validation sets
+            train_metrics, y_train_pred = _evaluate(model, X_train_transformed, y_train)
+            val_metrics, y_val_pred = _evaluate(model, X_val_transformed, y_val)
         
         # Log metrics
         mlflow.log_metrics({
-            'train_accuracy': train_accuracy,
-            'train_precision': train_precision,
-            'train_recall': train_recall,
-            'train_f1': train_f1,
-            'train_auc': train_auc,
-            'val_accuracy': val_accuracy,
-            'val_precision': val_precision,
-            'val_recall': val_recall,
-            'val_f1': val_f1,
-            'val_auc': val_auc
+            **{f'train_{name}': value for name, value in train_metrics.items()},
+            **{f'val_{name}': value for name, value in val_metrics.items()}
         })
         
         # Print metrics using sklearn's classification_report
         print("\n" + "=" * 70)
         print("TRAINING SET RESULTS:")
         print("=" * 70)
-        print(f"\nAccuracy: {train_accuracy:.4f}")
-        print(f"AUC-ROC:  {train_auc:.4f}\n")
+        print(f"\nAccuracy: {train_metrics['accuracy']:.4f}")
+        print(f"AUC-ROC:  {train_metrics['auc']:.4f}\n")
         print("Classification Report:")
         print(classification_report(y_train, y_train_pred, 
                                     target_names=['No Churn', 'Churn'],
@@ -127,8 +288,8 @@ def train_model(config_path: str = "configs/model1.yaml"):
         print("\n" + "=" * 70)
         print("VALIDATION SET RESULTS:")
         print("=" * 70)
-        print(f"\nAccuracy: {val_accuracy:.4f}")
-        print(f"AUC-ROC:  {val_auc:.4f}\n")
+        print(f"\nAccuracy: {val_metrics['accuracy']:.4f}")
+        print(f"AUC-ROC:  {val_metrics['auc']:.4f}\n")
         print("Classification Report:")
         print(classification_report(y_val, y_val_pred, 
                                     target_names=['No Churn', 'Churn'],
@@ -149,13 +310,28 @@ def train_model(config_path: str = "configs/model1.yaml"):
         model.save(model_dir / "churn_model.pkl")
         preprocessor.save(model_dir / "preprocessor.pkl")
         
+        # ONNX copy of the model for serving (optional: the joblib model is
+        # served when there is none, so a failed export must not stop the run).
+        # Any export of a previous model is removed first.
+        onnx_path = model_dir / "churn_model.onnx"
+        onnx_path.unlink(missing_ok=True)
+        if model.uses_categorical_splits:
+            print("Skipping ONNX export: native categorical splits are not supported")
+        else:
+            try:
+                model.export_onnx(onnx_path, X_train_transformed.shape[1])
+            except Exception as e:
+                onnx_path.unlink(missing_ok=True)
+                print(f"Skipping ONNX export: {e}")
+        
         # Create input example for model signature
         input_example = X_train_transformed[:5]  # First 5 rows as example
         
         # Log model to MLflow with signature
         # Using signature inference to avoid artifact_path deprecation warning
+        # (the schema only needs column types, so infer it from the example rows)
         from mlflow.models.signature import infer_signature
-        signature = infer_signature(X_train_transformed, y_train_pred)
+        signature = infer_signature(input_example, y_train_pred[:5])
         
         mlflow.sklearn.log_model(
             sk_model=model.model,
@@ -7,13 +7,20 @@ Monitors data quality and drift for production ML models:
 - Target drift monitoring
 - Feature drift tracking
 """
+import os
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+from scipy import stats
 from pathlib import Path
 from datetime import datetime
 import json
-from typing import Dict, Optional
+import uuid
+from typing import Dict, List, Optional, Tuple
 import logging
+from functools import lru_cache
 
+from ..data.ingestion import DTYPES
 from evidently import ColumnMapping
 from evidently.report import Report
 from evidently.metric_preset import DataDriftPreset, DataQualityPreset, TargetDriftPreset
@@ -28,58 +35,88 @@ from evidently.tests import (
 
 logger = logging.getLogger(__name__)
 
+# Telco column types for CSV inputs (the target keeps whatever encoding the
+# file uses, so it matches the reference data)
+CSV_DTYPES = {col: dtype for col, dtype in DTYPES.items() if col != 'Churn'}
+
 
 class DriftMonitor:
     """Monitor data drift for churn prediction model."""
     
-    def __init__(self, reference_data_path: str, output_dir: str = "reports/drift"):
+    # Identifier columns that never take part in the comparison (not read)
+    ID_COLUMNS = ['customerID']
+    
+    def __init__(self, reference_data_path: str, output_dir: str = "reports/drift",
+                 reference_split: Optional[str] = "train",
+                 sample_size_limit: Optional[int] = 100_000):
         """
         Initialize drift monitor.
         
         Args:
             reference_data_path: Path to reference dataset (training data)
             output_dir: Directory to save drift reports
+            reference_split: Split to use when the reference file is the
+                combined processed dataset (ignored for other files)
+            sample_size_limit: Maximum rows of reference and current data
+                compared (larger frames are randomly subsampled; None = all)
         """
-        self.reference_data = pd.read_csv(reference_data_path)
+        self.sample_size_limit = sample_size_limit
+        # Columns compared (features and target), from a header-only read;
+        # the rest of the file is never parsed
+        excluded = {'split', *self.ID_COLUMNS}
+        self.feature_cols = [col for col in _column_names(reference_data_path)
+                             if col not in excluded]
+        self.reference_data = _cap_rows(
+            _load_data(reference_data_path, split=reference_split, columns=self.feature_cols),
+            sample_size_limit
+        )
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Feature columns by type (the reference data never changes)
+        self.numerical_features, self.categorical_features = self._get_feature_columns()
+        
         # Define column mapping for Evidently
         self.column_mapping = ColumnMapping(
             target='Churn' if 'Churn' in self.reference_data.columns else None,
-            numerical_features=self._get_numerical_features(),
-            categorical_features=self._get_categorical_features()
+            numerical_features=self.numerical_features,
+            categorical_features=self.categorical_features
         )
         
+        # Sorted reference values per numerical feature (for fast_drift_summary)
+        self._ref_sorted = {col: _sorted_values(self.reference_data[col])
+                            for col in self.numerical_features}
+        
         logger.info(f"DriftMonitor initialized with reference data: {len(self.reference_data)} rows")
     
-    def _get_numerical_features(self) -> list:
-        """Get numerical feature names."""
-        numeric_cols = self.reference_data.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    def _get_feature_columns(self) -> Tuple[list, list]:
+        """Get numerical and categorical feature names in one pass over the dtypes."""
         # Exclude target and ID columns
-        exclude = ['Churn', 'customerID']
-        return [col for col in numeric_cols if col not in exclude]
-    
-    def _get_categorical_features(self) -> list:
-        """Get categorical feature names."""
-        cat_cols = self.reference_data.select_dtypes(include=['object']).columns.tolist()
-        # Exclude target and ID columns
-        exclude = ['Churn', 'customerID']
-        return [col for col in cat_cols if col not in exclude]
+        exclude = {'Churn', *self.ID_COLUMNS}
+        features = [(col, dtype.kind) for col, dtype in self.reference_data.dtypes.items()
+                    if col not in exclude]
+        
+        numeric_cols = [col for col, kind in features if kind in 'iuf']
+        cat_cols = [col for col, kind in features if kind == 'O']
+        return numeric_cols, cat_cols
     
     def generate_drift_report(
         self, 
         current_data: pd.DataFrame,
-        save_html: bool = True,
-        save_json: bool = True
+        save_html: bool = False,
+        save_json: bool = True,
+        run_id: Optional[str] = None,
+        pretty_json: bool = False
     ) -> Dict:
         """
         Generate comprehensive drift report.
         
         Args:
             current_data: Current production data to compare
-            save_html: Save HTML report
+            save_html: Save HTML report (slow to render; off for automated runs)
             save_json: Save JSON report
+            run_id: Filename stem for the saved reports (a new one if None)
+            pretty_json: Indent the JSON report (compact by default)
             
         Returns:
             Dictionary with drift metrics
@@ -95,16 +132,15 @@ class DriftMonitor:
         # Run report
         report.run(
             reference_data=self.reference_data,
-            current_data=current_data,
+            current_data=_cap_rows(current_data, self.sample_size_limit),
             column_mapping=self.column_mapping
         )
         
-        # Generate timestamp for filenames
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_id = run_id or _new_run_id()
         
         # Save HTML report
         if save_html:
-            html_path = self.output_dir / f"drift_report_{timestamp}.html"
+            html_path = self.output_dir / f"drift_report_{run_id}.html"
             report.save_html(str(html_path))
             logger.info(f"HTML report saved: {html_path}")
         
@@ -113,22 +149,25 @@ class DriftMonitor:
         
         # Save JSON report
         if save_json:
-            json_path = self.output_dir / f"drift_metrics_{timestamp}.json"
-            with open(json_path, 'w') as f:
-                json.dump(report_json, f, indent=2)
+            json_path = self.output_dir / f"drift_metrics_{run_id}.json"
+            _write_json(json_path, report_json, pretty=pretty_json)
             logger.info(f"JSON metrics saved: {json_path}")
         
         # Extract key metrics
         drift_summary = self._extract_drift_summary(report_json)
+        drift_summary['run_id'] = run_id
         
         return drift_summary
     
-    def run_drift_tests(self, current_data: pd.DataFrame) -> Dict:
+    def run_drift_tests(self, current_data: pd.DataFrame, save_html: bool = False,
+                        run_id: Optional[str] = None) -> Dict:
         """
         Run automated drift tests.
         
         Args:
             current_data: Current production data
+            save_html: Save HTML test report (report_path is None otherwise)
+            run_id: Filename stem for the saved report (a new one if None)
             
         Returns:
             Dictionary with test results
@@ -147,14 +186,16 @@ class DriftMonitor:
         # Run tests
         test_suite.run(
             reference_data=self.reference_data,
-            current_data=current_data,
+            current_data=_cap_rows(current_data, self.sample_size_limit),
             column_mapping=self.column_mapping
         )
         
         # Save test results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        html_path = self.output_dir / f"drift_tests_{timestamp}.html"
-        test_suite.save_html(str(html_path))
+        run_id = run_id or _new_run_id()
+        html_path = None
+        if save_html:
+            html_path = self.output_dir / f"drift_tests_{run_id}.html"
+            test_suite.save_html(str(html_path))
         
         # Get test results
         test_results = test_suite.as_dict()
@@ -167,9 +208,10 @@ class DriftMonitor:
         
         return {
             'all_tests_passed': all_passed,
-            'timestamp': timestamp,
+            'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
+            'run_id': run_id,
             'test_results': test_results,
-            'report_path': str(html_path)
+            'report_path': str(html_path) if html_path else None
         }
     
     def _extract_drift_summary(self, report_json: Dict) -> Dict:
@@ -177,37 +219,77 @@ class DriftMonitor:
         try:
             metrics = report_json.get('metrics', [])
             
-            summary = {
+            # Dataset drift metric (one per report)
+            metric = next((m for m in metrics if 'DatasetDriftMetric' in m.get('metric', '')), None)
+            result = metric.get('result', {}) if metric is not None else {}
+            
+            return {
                 'timestamp': datetime.now().isoformat(),
-                'dataset_drift_detected': False,
-                'number_of_drifted_columns': 0,
-                'share_of_drifted_columns': 0.0,
-                'drifted_features': []
+                'dataset_drift_detected': result.get('dataset_drift', False),
+                'number_of_drifted_columns': result.get('number_of_drifted_columns', 0),
+                'share_of_drifted_columns': result.get('share_of_drifted_columns', 0.0),
+                'drifted_features': [
+                    col for col, info in result.get('drift_by_columns', {}).items()
+                    if info.get('drift_detected', False)
+                ]
             }
             
-            # Extract dataset drift metric
-            for metric in metrics:
-                metric_type = metric.get('metric', '')
-                
-                if 'DatasetDriftMetric' in metric_type:
-                    result = metric.get('result', {})
-                    summary['dataset_drift_detected'] = result.get('dataset_drift', False)
-                    summary['number_of_drifted_columns'] = result.get('number_of_drifted_columns', 0)
-                    summary['share_of_drifted_columns'] = result.get('share_of_drifted_columns', 0.0)
-                    
-                    # Get list of drifted features
-                    drift_by_columns = result.get('drift_by_columns', {})
-                    summary['drifted_features'] = [
-                        col for col, info in drift_by_columns.items()
-                        if info.get('drift_detected', False)
-                    ]
-            
-            return summary
-            
         except Exception as e:
             logger.error(f"Error extracting drift summary: {e}")
             return {'error': str(e)}
     
+    def _ks_drift(self, col: str, current: pd.Series) -> float:
+        """
+        Two-sample Kolmogorov-Smirnov p-value of a column against the reference.
+        
+        Both empirical CDFs are evaluated with np.searchsorted on sorted
+        values; the reference side was sorted once in __init__.
+        """
+        ref = self._ref_sorted[col]
+        cur = _sorted_values(current)
+        if len(ref) == 0 or len(cur) == 0:
+            return 1.0
+        
+        points = np.concatenate([ref, cur])
+        statistic = np.abs(
+            np.searchsorted(ref, points, side='right') / len(ref)
+            - np.searchsorted(cur, points, side='right') / len(cur)
+        ).max()
+        
+        # Asymptotic distribution, as in scipy.stats.ks_2samp(method='asymp')
+        n_eff = np.round(len(ref) * len(cur) / (len(ref) + len(cur)))
+        return float(stats.kstwo.sf(statistic, n_eff))
+    
+    def fast_drift_summary(self, current_data: pd.DataFrame, threshold: float = 0.05,
+                           drift_share: float = 0.5) -> Dict:
+        """
+        Drift summary for the numerical features without running Evidently.
+        
+        Each numerical feature is KS-tested against the cached reference
+        values; the result has the same keys as generate_drift_report's.
+        
+        Args:
+            current_data: Current production data to compare
+            threshold: p-value below which a column counts as drifted
+            drift_share: Share of drifted columns that flags dataset drift
+            
+        Returns:
+            Dictionary with drift metrics
+        """
+        current_data = _cap_rows(current_data, self.sample_size_limit)
+        columns = [col for col in self.numerical_features if col in current_data.columns]
+        
+        drifted = [col for col in columns if self._ks_drift(col, current_data[col]) < threshold]
+        share = len(drifted) / len(columns) if columns else 0.0
+        
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'dataset_drift_detected': share >= drift_share,
+            'number_of_drifted_columns': len(drifted),
+            'share_of_drifted_columns': share,
+            'drifted_features': drifted
+        }
+    
     def check_drift_alert(self, drift_summary: Dict, threshold: float = 0.3) -> bool:
         """
         Check if drift exceeds threshold and should trigger alert.
@@ -233,10 +315,105 @@ class DriftMonitor:
         return should_alert
 
 
+def _new_run_id() -> str:
+    """Unique report name stem: start time plus a short random suffix."""
+    return f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
+
+
+def _sorted_values(series: pd.Series) -> np.ndarray:
+    """Sorted float64 values of a numeric column, NaNs removed."""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.sort(values[~np.isnan(values)])
+
+
+def _cap_rows(df: pd.DataFrame, limit: Optional[int]) -> pd.DataFrame:
+    """Randomly subsample df to at most limit rows (reproducibly)."""
+    if limit is None or len(df) <= limit:
+        return df
+    return df.sample(limit, random_state=0)
+
+
+def _write_json(path: Path, data: Dict, pretty: bool = False):
+    """
+    Write a dict as JSON (compact, or indented with pretty=True).
+    
+    Uses orjson (native encoder, handles NumPy values) when installed and
+    falls back to the stdlib json module otherwise.
+    """
+    try:
+        import orjson
+    except ImportError:
+        with open(path, 'w') as f:
+            json.dump(data, f, **({'indent': 2} if pretty else {'separators': (',', ':')}))
+        return
+    
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    path.write_bytes(orjson.dumps(data, option=option))
+
+
+def _column_names(path: str) -> List[str]:
+    """Column names of a Parquet or CSV file, without reading any rows."""
+    if Path(path).suffix != '.parquet':
+        return list(pd.read_csv(path, nrows=0).columns)
+    return pq.read_schema(path).names
+
+
+def _load_data(path: str, split: Optional[str] = None,
+               columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Load a dataset from Parquet or CSV based on the file extension.
+    
+    CSV files are parsed by the pyarrow engine with the known telco column
+    types. For the combined processed dataset (Parquet with a 'split' column),
+    only the rows of the given split are read and the split column is dropped.
+    
+    Args:
+        path: Path to the data file
+        split: Split to read from the combined processed dataset
+        columns: Columns to read (names missing from the file are skipped;
+            None = all columns)
+    """
+    names = _column_names(path)
+    if columns is not None:
+        columns = [col for col in columns if col in names]
+    
+    if Path(path).suffix != '.parquet':
+        usecols = columns if columns is not None else names
+        return pd.read_csv(path, engine='pyarrow', usecols=usecols,
+                           dtype={col: CSV_DTYPES[col] for col in usecols if col in CSV_DTYPES})
+    
+    if 'split' not in names:
+        return pd.read_parquet(path, columns=columns)
+    
+    filters = [('split', '==', split)] if split is not None else None
+    data = pd.read_parquet(path, columns=columns, filters=filters)
+    return data.drop(columns=['split'], errors='ignore')
+
+
+@lru_cache(maxsize=4)
+def _get_monitor(reference_data_path: str, mtime_ns: int, size: int, output_dir: str,
+                 reference_split: Optional[str], sample_size_limit: Optional[int]) -> DriftMonitor:
+    """
+    Shared DriftMonitor per reference file version.
+    
+    The file's mtime and size are part of the cache key, so a rewritten
+    reference file gets a fresh monitor instead of the stale cached one.
+    """
+    return DriftMonitor(reference_data_path, output_dir, reference_split=reference_split,
+                        sample_size_limit=sample_size_limit)
+
+
 def monitor_production_data(
     current_data_path: str,
-    reference_data_path: str = "data/processed/train.csv",
-    output_dir: str = "reports/drift"
+    reference_data_path: str = "data/processed/dataset.parquet",
+    output_dir: str = "reports/drift",
+    reference_split: Optional[str] = "train",
+    current_split: Optional[str] = None,
+    sample_size_limit: Optional[int] = 100_000,
+    render_html: bool = False,
+    pretty_json: bool = False
 ) -> Dict:
     """
     Convenience function to monitor production data.
@@ -245,22 +422,37 @@ def monitor_production_data(
         current_data_path: Path to current production data
         reference_data_path: Path to reference training data
         output_dir: Output directory for reports
+        reference_split: Split to use as reference when the reference file is
+            the combined processed dataset (ignored for other files)
+        current_split: Split to use as current data when the current file is
+            the combined processed dataset (ignored for other files)
+        sample_size_limit: Maximum rows of reference and current data compared
+        render_html: Also save the HTML report and test report (for humans)
+        pretty_json: Indent the saved JSON metrics (compact by default)
         
     Returns:
         Drift summary with alert status
     """
-    # Initialize monitor
-    monitor = DriftMonitor(reference_data_path, output_dir)
+    # Initialize monitor (reused while the reference file is unchanged)
+    stat = os.stat(reference_data_path)
+    monitor = _get_monitor(reference_data_path, stat.st_mtime_ns, stat.st_size,
+                           output_dir, reference_split, sample_size_limit)
     
-    # Load current data
-    current_data = pd.read_csv(current_data_path)
+    # Load current data (only the columns the monitor compares)
+    current_data = _load_data(current_data_path, split=current_split,
+                              columns=monitor.feature_cols)
     logger.info(f"Loaded current data: {len(current_data)} rows")
     
+    # One id per monitoring run names all of its report files
+    run_id = _new_run_id()
+    
     # Generate drift report
-    drift_summary = monitor.generate_drift_report(current_data)
+    drift_summary = monitor.generate_drift_report(current_data, save_html=render_html,
+                                                  run_id=run_id, pretty_json=pretty_json)
     
     # Run tests
-    test_results = monitor.run_drift_tests(current_data)
+    test_results = monitor.run_drift_tests(current_data, save_html=render_html, run_id=run_id)
+    
     drift_summary['tests_passed'] = test_results['all_tests_passed']
     
     # Check if alert needed
@@ -271,13 +463,32 @@ def monitor_production_data(
 
 if __name__ == "__main__":
     # Example usage
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Run data drift monitoring")
+    parser.add_argument(
+        "--render-html",
+        action="store_true",
+        help="Also save the HTML drift report and test report"
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent the saved JSON metrics (compact by default)"
+    )
+    args = parser.parse_args()
+    
     logging.basicConfig(level=logging.INFO)
     
     # Monitor drift using validation data as "current" data
     # (In production, this would be actual production data)
     summary = monitor_production_data(
-        current_data_path="data/processed/val.csv",
-        reference_data_path="data/processed/train.csv"
+        current_data_path="data/processed/dataset.parquet",
+        reference_data_path="data/processed/dataset.parquet",
+        reference_split="train",
+        current_split="val",
+        render_html=args.render_html,
+        pretty_json=args.pretty
     )
     
     print("\n" + "="*70)
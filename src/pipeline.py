@@ -3,6 +3,13 @@ Complete data processing pipeline for telco churn prediction.
 """
 import sys
 from pathlib import Path
+import joblib
+import pandas as pd
+from typing import Optional
+
+# Copy-on-write: the steps below return new frames via assign/dropna/copy,
+# which then share unchanged columns instead of copying them
+pd.options.mode.copy_on_write = True
 
 # Add src to path
 sys.path.append(str(Path(__file__).parent))
@@ -11,19 +18,27 @@ from data.ingestion import load_raw_data
 from data.cleaning import handle_missing_values, handle_data_types
 from data.validation import validate_data_schema, validate_target_variable
 from data.labeling import encode_target
-from data.build_features import create_tenure_bins, create_revenue_features
-from data.encoding import encode_categorical_features
+from data.build_features import add_features
+from data.encoding import encode_categorical_features, fit_onehot_encoder
 from data.splitting import split_data, save_splits
 
 
 def run_data_pipeline(raw_data_path: str = "data/raw/telco_churn.csv",
-                     output_dir: str = "data/processed"):
+                     output_dir: str = "data/processed",
+                     encoder_path: str = "models/onehot_encoder.pkl",
+                     chunksize: Optional[int] = None,
+                     keep_categorical: bool = False):
     """
     Run the complete data processing pipeline.
     
     Args:
         raw_data_path: Path to raw data CSV
         output_dir: Directory to save processed data
+        encoder_path: Path to save the fitted one-hot encoder (reused at inference)
+        chunksize: If set, stream the raw CSV in chunks of this many rows
+            (type conversion and cleaning are applied per chunk)
+        keep_categorical: Skip one-hot encoding and save the categorical
+            columns as they are (for preprocessing.encode_categorical: ordinal)
     """
     print("=" * 60)
     print("Starting Data Processing Pipeline")
@@ -31,7 +46,7 @@ def run_data_pipeline(raw_data_path: str = "data/raw/telco_churn.csv",
     
     # Step 1: Load raw data
     print("\n[1/7] Loading raw data...")
-    df = load_raw_data(raw_data_path)
+    df = load_raw_data(raw_data_path, chunksize=chunksize)
     print(f"✓ Loaded {len(df)} rows")
     
     # Step 2: Handle data types
@@ -59,16 +74,21 @@ def run_data_pipeline(raw_data_path: str = "data/raw/telco_churn.csv",
     
     # Step 6: Feature engineering
     print("\n[6/8] Engineering features...")
-    if 'tenure' in df.columns:
-        df = create_tenure_bins(df)
-    if 'MonthlyCharges' in df.columns and 'tenure' in df.columns:
-        df = create_revenue_features(df)
+    df = add_features(df)
     print("✓ Features engineered")
     
     # Step 7: Encode categorical features
     print("\n[7/8] Encoding categorical features...")
-    df = encode_categorical_features(df, encoding_type='onehot')
-    print("✓ Categorical features encoded")
+    if keep_categorical:
+        # Don't leave an encoder from a previous run for the predictor to apply
+        Path(encoder_path).unlink(missing_ok=True)
+        print("✓ Categorical features kept as categories (no one-hot encoding)")
+    else:
+        encoder = fit_onehot_encoder(df, exclude_cols=['Churn'])
+        df = encode_categorical_features(df, encoding_type='onehot', encoder=encoder)
+        Path(encoder_path).parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(encoder, encoder_path)
+        print(f"✓ Categorical features encoded (encoder saved to {encoder_path})")
     
     # Step 8: Split data
     print("\n[8/8] Splitting data into train/val/test sets...")
@@ -84,9 +104,10 @@ def run_data_pipeline(raw_data_path: str = "data/raw/telco_churn.csv",
     print("Data Pipeline Complete!")
     print("=" * 60)
     print(f"\nProcessed data saved to: {output_dir}/")
-    print(f"  - train.csv: {len(X_train)} samples")
-    print(f"  - val.csv: {len(X_val)} samples")
-    print(f"  - test.csv: {len(X_test)} samples")
+    print(f"  - dataset.parquet (split column):")
+    print(f"      train: {len(X_train)} samples")
+    print(f"      val:   {len(X_val)} samples")
+    print(f"      test:  {len(X_test)} samples")
     print("\nReady for model training!")
 
 
@@ -110,10 +131,23 @@ def main():
         help="Output directory for processed data"
     )
     
+    parser.add_argument(
+        "--chunksize", 
+        type=int, 
+        default=None,
+        help="Stream the raw CSV in chunks of this many rows (for large files)"
+    )
+    parser.add_argument(
+        "--keep-categorical",
+        action="store_true",
+        help="Save categorical columns unencoded (for ordinal encoding at training)"
+    )
+    
     args = parser.parse_args()
     
     try:
-        run_data_pipeline(args.input, args.output)
+        run_data_pipeline(args.input, args.output, chunksize=args.chunksize,
+                          keep_categorical=args.keep_categorical)
     except FileNotFoundError as e:
         print(f"\n❌ Error: {e}")
         print("\nPlease download the telco churn dataset from Kaggle:")
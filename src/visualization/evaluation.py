@@ -2,10 +2,9 @@
 Model evaluation visualization module.
 """
 import numpy as np
-import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import confusion_matrix, roc_curve, auc, precision_recall_curve
-from pathlib import Path
+from .figures import get_figure, save_figure
 
 
 def plot_confusion_matrix(y_true, y_pred, save_path: str = None):
@@ -19,20 +18,16 @@ def plot_confusion_matrix(y_true, y_pred, save_path: str = None):
     """
     cm = confusion_matrix(y_true, y_pred)
     
-    plt.figure(figsize=(8, 6))
+    fig = get_figure((8, 6))
+    ax = fig.add_subplot()
     sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
                 xticklabels=['No Churn', 'Churn'],
-                yticklabels=['No Churn', 'Churn'])
-    plt.title('Confusion Matrix')
-    plt.ylabel('True Label')
-    plt.xlabel('Predicted Label')
+                yticklabels=['No Churn', 'Churn'], ax=ax)
+    ax.set_title('Confusion Matrix')
+    ax.set_ylabel('True Label')
+    ax.set_xlabel('Predicted Label')
     
-    if save_path:
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {save_path}")
-    
-    plt.close()
+    save_figure(fig, save_path)
 
 
 def plot_roc_curve(y_true, y_proba, save_path: str = None):
@@ -47,25 +42,21 @@ def plot_roc_curve(y_true, y_proba, save_path: str = None):
     fpr, tpr, _ = roc_curve(y_true, y_proba)
     roc_auc = auc(fpr, tpr)
     
-    plt.figure(figsize=(8, 6))
-    plt.plot(fpr, tpr, color='darkorange', lw=2, 
-             label=f'ROC curve (AUC = {roc_auc:.2f})')
-    plt.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--', 
-             label='Random Classifier')
-    plt.xlim([0.0, 1.0])
-    plt.ylim([0.0, 1.05])
-    plt.xlabel('False Positive Rate')
-    plt.ylabel('True Positive Rate')
-    plt.title('Receiver Operating Characteristic (ROC) Curve')
-    plt.legend(loc="lower right")
-    plt.grid(alpha=0.3)
-    
-    if save_path:
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {save_path}")
-    
-    plt.close()
+    fig = get_figure((8, 6))
+    ax = fig.add_subplot()
+    ax.plot(fpr, tpr, color='darkorange', lw=2, 
+            label=f'ROC curve (AUC = {roc_auc:.2f})')
+    ax.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--', 
+            label='Random Classifier')
+    ax.set_xlim([0.0, 1.0])
+    ax.set_ylim([0.0, 1.05])
+    ax.set_xlabel('False Positive Rate')
+    ax.set_ylabel('True Positive Rate')
+    ax.set_title('Receiver Operating Characteristic (ROC) Curve')
+    ax.legend(loc="lower right")
+    ax.grid(alpha=0.3)
+    
+    save_figure(fig, save_path)
 
 
 def plot_precision_recall_curve(y_true, y_proba, save_path: str = None):
@@ -79,19 +70,15 @@ def plot_precision_recall_curve(y_true, y_proba, save_path: str = None):
     """
     precision, recall, _ = precision_recall_curve(y_true, y_proba)
     
-    plt.figure(figsize=(8, 6))
-    plt.plot(recall, precision, color='darkorange', lw=2)
-    plt.xlabel('Recall')
-    plt.ylabel('Precision')
-    plt.title('Precision-Recall Curve')
-    plt.grid(alpha=0.3)
-    
-    if save_path:
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {save_path}")
+    fig = get_figure((8, 6))
+    ax = fig.add_subplot()
+    ax.plot(recall, precision, color='darkorange', lw=2)
+    ax.set_xlabel('Recall')
+    ax.set_ylabel('Precision')
+    ax.set_title('Precision-Recall Curve')
+    ax.grid(alpha=0.3)
     
-    plt.close()
+    save_figure(fig, save_path)
 
 
 def plot_feature_importance(feature_names, feature_importances, 
@@ -105,22 +92,21 @@ def plot_feature_importance(feature_names, feature_importances,
         top_n: Number of top features to display
         save_path: Path to save figure
     """
-    # Sort features by importance
-    indices = np.argsort(feature_importances)[::-1][:top_n]
-    
-    plt.figure(figsize=(10, 8))
-    plt.barh(range(top_n), feature_importances[indices])
-    plt.yticks(range(top_n), [feature_names[i] for i in indices])
-    plt.xlabel('Importance')
-    plt.title(f'Top {top_n} Feature Importances')
-    plt.gca().invert_yaxis()
-    
-    if save_path:
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {save_path}")
-    
-    plt.close()
+    # Top features by importance: partition out the top_n, then sort only those
+    feature_importances = np.asarray(feature_importances)
+    top_n = min(top_n, len(feature_importances))
+    top_idx = np.argpartition(-feature_importances, top_n - 1)[:top_n]
+    indices = top_idx[np.argsort(-feature_importances[top_idx])]
+    
+    fig = get_figure((10, 8))
+    ax = fig.add_subplot()
+    ax.barh(range(top_n), feature_importances[indices])
+    ax.set_yticks(range(top_n), [feature_names[i] for i in indices])
+    ax.set_xlabel('Importance')
+    ax.set_title(f'Top {top_n} Feature Importances')
+    ax.invert_yaxis()
+    
+    save_figure(fig, save_path)
 
 
 def main():
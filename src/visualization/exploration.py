@@ -1,10 +1,11 @@
 """
 Exploratory data analysis and visualization module.
 """
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+from .figures import get_figure, save_figure
 
 
 def plot_target_distribution(df: pd.DataFrame, target_col: str = 'Churn', 
@@ -17,19 +18,15 @@ def plot_target_distribution(df: pd.DataFrame, target_col: str = 'Churn',
         target_col: Name of target column
         save_path: Path to save figure
     """
-    plt.figure(figsize=(8, 6))
-    df[target_col].value_counts().plot(kind='bar')
-    plt.title(f'Distribution of {target_col}')
-    plt.xlabel(target_col)
-    plt.ylabel('Count')
-    plt.xticks(rotation=0)
-    
-    if save_path:
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {save_path}")
-    
-    plt.close()
+    fig = get_figure((8, 6))
+    ax = fig.add_subplot()
+    df[target_col].value_counts().plot(kind='bar', ax=ax)
+    ax.set_title(f'Distribution of {target_col}')
+    ax.set_xlabel(target_col)
+    ax.set_ylabel('Count')
+    ax.tick_params(axis='x', labelrotation=0)
+    
+    save_figure(fig, save_path)
 
 
 def plot_feature_distributions(df: pd.DataFrame, save_dir: str = None):
@@ -40,16 +37,23 @@ def plot_feature_distributions(df: pd.DataFrame, save_dir: str = None):
         df: Input DataFrame
         save_dir: Directory to save figures
     """
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+    numeric_cols = df.select_dtypes(include='number').columns
     
     n_cols = 3
     n_rows = (len(numeric_cols) + n_cols - 1) // n_cols
     
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5*n_rows))
-    axes = axes.flatten()
+    fig = get_figure((15, 5*n_rows))
+    axes = fig.subplots(n_rows, n_cols, squeeze=False).flatten()
+    
+    # One block for all columns; NaNs are masked out per column. float64 on
+    # purpose: integer values sitting on bin edges land in the same bins as
+    # before, which float32 edges don't guarantee
+    values = df[numeric_cols].to_numpy(dtype=np.float64)
     
     for idx, col in enumerate(numeric_cols):
-        axes[idx].hist(df[col].dropna(), bins=30, edgecolor='black')
+        column = values[:, idx]
+        counts, edges = np.histogram(column[~np.isnan(column)], bins=30)
+        axes[idx].bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='black')
         axes[idx].set_title(col)
         axes[idx].set_xlabel(col)
         axes[idx].set_ylabel('Frequency')
@@ -58,15 +62,10 @@ def plot_feature_distributions(df: pd.DataFrame, save_dir: str = None):
     for idx in range(len(numeric_cols), len(axes)):
         axes[idx].set_visible(False)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     if save_dir:
-        save_path = Path(save_dir) / "feature_distributions.png"
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {save_path}")
-    
-    plt.close()
+        save_figure(fig, Path(save_dir) / "feature_distributions.png")
 
 
 def plot_correlation_matrix(df: pd.DataFrame, save_path: str = None):
@@ -77,19 +76,24 @@ def plot_correlation_matrix(df: pd.DataFrame, save_path: str = None):
         df: Input DataFrame
         save_path: Path to save figure
     """
-    numeric_df = df.select_dtypes(include=['int64', 'float64'])
-    
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(numeric_df.corr(), annot=True, fmt='.2f', 
-                cmap='coolwarm', center=0, square=True)
-    plt.title('Feature Correlation Matrix')
-    
-    if save_path:
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {save_path}")
-    
-    plt.close()
+    numeric_df = df.select_dtypes(include='number')
+    
+    values = np.ascontiguousarray(numeric_df.to_numpy(dtype=np.float32))
+    if np.isnan(values).any():
+        # Pairwise-complete correlations (np.corrcoef would turn any column
+        # with a missing value into NaNs)
+        corr = numeric_df.corr().to_numpy()
+    else:
+        corr = np.corrcoef(values, rowvar=False)
+    
+    fig = get_figure((12, 10))
+    ax = fig.add_subplot()
+    sns.heatmap(corr, annot=True, fmt='.2f', 
+                cmap='coolwarm', center=0, square=True,
+                xticklabels=numeric_df.columns, yticklabels=numeric_df.columns, ax=ax)
+    ax.set_title('Feature Correlation Matrix')
+    
+    save_figure(fig, save_path)
 
 
 def plot_churn_by_categorical(df: pd.DataFrame, categorical_col: str, 
@@ -103,23 +107,20 @@ def plot_churn_by_categorical(df: pd.DataFrame, categorical_col: str,
         target_col: Name of target column
         save_path: Path to save figure
     """
-    churn_rate = df.groupby(categorical_col)[target_col].apply(
-        lambda x: (x == 'Yes').sum() / len(x) if 'Yes' in x.values else x.mean()
-    )
-    
-    plt.figure(figsize=(10, 6))
-    churn_rate.plot(kind='bar')
-    plt.title(f'Churn Rate by {categorical_col}')
-    plt.xlabel(categorical_col)
-    plt.ylabel('Churn Rate')
-    plt.xticks(rotation=45)
-    
-    if save_path:
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Plot saved to {save_path}")
-    
-    plt.close()
+    # 0/1 churn flag ('Yes'/'No' targets are encoded once), averaged per group
+    target = df[target_col]
+    churned = target if pd.api.types.is_numeric_dtype(target) else target.eq('Yes').astype(np.int8)
+    churn_rate = churned.groupby(df[categorical_col], observed=False).mean()
+    
+    fig = get_figure((10, 6))
+    ax = fig.add_subplot()
+    churn_rate.plot(kind='bar', ax=ax)
+    ax.set_title(f'Churn Rate by {categorical_col}')
+    ax.set_xlabel(categorical_col)
+    ax.set_ylabel('Churn Rate')
+    ax.tick_params(axis='x', labelrotation=45)
+    
+    save_figure(fig, save_path)
 
 
 def main():
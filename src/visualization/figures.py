@@ -0,0 +1,48 @@
+"""
+Figure handling shared by the visualization modules.
+
+Figures are plain matplotlib Figure objects rendered with the Agg canvas (no
+pyplot state, no GUI backend). One figure is kept per size and cleared for
+reuse, instead of creating and tearing down a new figure for every plot.
+"""
+from pathlib import Path
+from typing import Dict, Tuple
+from matplotlib.figure import Figure
+
+
+# Resolution of saved plots
+DPI = 150
+
+_FIGURES: Dict[Tuple[float, float], Figure] = {}
+
+
+def get_figure(figsize: Tuple[float, float]) -> Figure:
+    """
+    Get an empty figure of the given size.
+
+    Args:
+        figsize: Figure size in inches (width, height)
+
+    Returns:
+        Cleared figure (reused across calls with the same size)
+    """
+    fig = _FIGURES.get(figsize)
+    if fig is None:
+        fig = _FIGURES[figsize] = Figure(figsize=figsize)
+    else:
+        fig.clear()
+    return fig
+
+
+def save_figure(fig: Figure, save_path: str = None):
+    """
+    Save a figure as an image if a path is given.
+
+    Args:
+        fig: Figure to save
+        save_path: Output path (parent directories are created)
+    """
+    if save_path:
+        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(save_path, dpi=DPI, bbox_inches='tight')
+        print(f"Plot saved to {save_path}")
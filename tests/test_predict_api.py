@@ -0,0 +1,176 @@
+"""
+End-to-end tests for the prediction API on a small synthetic dataset.
+
+The data pipeline, preprocessor and model are run for real; the API requests
+use the CustomerFeatures schema and must take the compiled encoder path.
+"""
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.pipeline import run_data_pipeline
+from src.models.model1.dataloader import ChurnDataLoader
+from src.models.model1.model import ChurnModel
+from src.models.model1.predict import ChurnPredictor
+from src.models.model1.preprocessing import ChurnPreprocessor
+
+
+INTERNET_ADDONS = ['OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+                   'TechSupport', 'StreamingTV', 'StreamingMovies']
+
+CUSTOMER = {
+    "gender": "Female",
+    "SeniorCitizen": 0,
+    "Partner": "Yes",
+    "Dependents": "No",
+    "tenure": 12,
+    "PhoneService": "Yes",
+    "MultipleLines": "No",
+    "InternetService": "Fiber optic",
+    "OnlineSecurity": "No",
+    "OnlineBackup": "Yes",
+    "DeviceProtection": "No",
+    "TechSupport": "No",
+    "StreamingTV": "Yes",
+    "StreamingMovies": "No",
+    "Contract": "Month-to-month",
+    "PaperlessBilling": "Yes",
+    "PaymentMethod": "Electronic check",
+    "MonthlyCharges": 70.35,
+    "TotalCharges": 840.20,
+    "numAdminTickets": 0,
+    "numTechTickets": 1
+}
+
+
+def _raw_telco(n_rows: int = 400) -> pd.DataFrame:
+    """Random rows in the raw telco CSV layout."""
+    rng = np.random.default_rng(0)
+
+    def choice(values):
+        return rng.choice(values, n_rows)
+
+    tenure = rng.integers(0, 73, n_rows)
+    monthly = rng.uniform(18, 120, n_rows).round(2)
+    df = pd.DataFrame({
+        'customerID': [f"{i:04d}-TEST" for i in range(n_rows)],
+        'gender': choice(['Male', 'Female']),
+        'SeniorCitizen': rng.integers(0, 2, n_rows),
+        'Partner': choice(['Yes', 'No']),
+        'Dependents': choice(['Yes', 'No']),
+        'tenure': tenure,
+        'PhoneService': choice(['Yes', 'No']),
+        'MultipleLines': choice(['Yes', 'No', 'No phone service']),
+        'InternetService': choice(['DSL', 'Fiber optic', 'No']),
+        **{col: choice(['Yes', 'No', 'No internet service']) for col in INTERNET_ADDONS},
+        'Contract': choice(['Month-to-month', 'One year', 'Two year']),
+        'PaperlessBilling': choice(['Yes', 'No']),
+        'PaymentMethod': choice(['Electronic check', 'Mailed check',
+                                 'Bank transfer (automatic)', 'Credit card (automatic)']),
+        'MonthlyCharges': monthly,
+        'TotalCharges': (monthly * tenure).round(2),
+        'numAdminTickets': rng.integers(0, 5, n_rows),
+        'numTechTickets': rng.integers(0, 5, n_rows),
+        'Churn': choice(['Yes', 'No']),
+    })
+    return df
+
+
+@pytest.fixture(scope="module")
+def predictor(tmp_path_factory):
+    """ChurnPredictor trained from the synthetic data through the real pipeline."""
+    root = tmp_path_factory.mktemp("churn")
+    raw_path = root / "raw.csv"
+    _raw_telco().to_csv(raw_path, index=False)
+
+    encoder_path = root / "onehot_encoder.pkl"
+    run_data_pipeline(str(raw_path), str(root / "processed"), encoder_path=str(encoder_path))
+
+    X_train, y_train = ChurnDataLoader(str(root / "processed")).load_train_data()
+    preprocessor = ChurnPreprocessor()
+    model = ChurnModel('logistic_regression')
+    model.fit(preprocessor.fit_transform(X_train), y_train)
+    model.save(root / "churn_model.pkl")
+    preprocessor.save(root / "preprocessor.pkl")
+
+    return ChurnPredictor(model_path=str(root / "churn_model.pkl"),
+                          preprocessor_path=str(root / "preprocessor.pkl"),
+                          encoder_path=str(encoder_path),
+                          onnx_path=str(root / "churn_model.onnx"))
+
+
+@pytest.fixture
+def compiled_calls(predictor, monkeypatch):
+    """Count compiled-encoder batches; fail if the DataFrame path is taken."""
+    calls = []
+    transform = predictor.compiled_encoder.transform
+
+    def counting_transform(records):
+        calls.append(len(records))
+        return transform(records)
+
+    def dataframe_path(X):
+        raise AssertionError("DataFrame fallback used for an API-shaped record")
+
+    monkeypatch.setattr(predictor.compiled_encoder, 'transform', counting_transform)
+    monkeypatch.setattr(predictor, 'predict', dataframe_path)
+    return calls
+
+
+@pytest.fixture
+def client(predictor, monkeypatch):
+    """API test client serving the synthetic predictor."""
+    monkeypatch.setenv("PRELOAD", "0")
+    app_module = importlib.import_module("src.api.app")
+    monkeypatch.setattr(app_module, "predictor", predictor)
+    with TestClient(app_module.app) as test_client:
+        yield test_client
+
+
+def test_compiled_encoder_matches_dataframe_path(predictor):
+    records = [CUSTOMER, {**CUSTOMER, "tenure": 60, "Contract": "Two year",
+                          "TotalCharges": 4221.0, "numTechTickets": 3}]
+
+    assert predictor.compiled_encoder.accepts(records[0])
+    compiled = predictor.predict_records(records)
+    dataframe = predictor.predict(pd.DataFrame.from_records(records))
+
+    np.testing.assert_allclose(compiled['churn_probability'], dataframe['churn_probability'],
+                               atol=1e-6)
+
+
+def test_predict_records_takes_compiled_path(predictor, compiled_calls):
+    from src.api.app import CustomerFeatures
+
+    records = [CustomerFeatures(**{**CUSTOMER, "tenure": tenure}).model_dump()
+               for tenure in (0, 12, 60)]
+    results = predictor.predict_records(records)
+
+    assert compiled_calls == [3]
+    assert len(results) == 3
+
+
+def test_api_predict_takes_compiled_path(client, compiled_calls):
+    response = client.post("/predict", json={"customers": [CUSTOMER, CUSTOMER]})
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()["predictions"]) == 2
+    assert compiled_calls == [2]
+
+
+def test_api_predict_single_takes_compiled_path(client, compiled_calls):
+    response = client.post("/predict/single", json=CUSTOMER)
+
+    assert response.status_code == 200, response.text
+    assert 0.0 <= response.json()["churn_probability"] <= 1.0
+    assert compiled_calls == [1]
+
+
+def test_api_rejects_missing_ticket_counts(client):
+    customer = {k: v for k, v in CUSTOMER.items() if k != "numTechTickets"}
+    response = client.post("/predict/single", json=customer)
+
+    assert response.status_code == 422